@@ -0,0 +1,72 @@
+"""Deterministic stand-ins for OpenAI chat and embedding calls, with configurable latency.
+
+install() swaps them in for the real backends, so ResumeAnalyzer, ResumeSession and the
+API endpoints run unchanged without network access or an API key.
+"""
+import time
+import hashlib
+from embeddings import EmbeddingProvider, HashingEmbeddingProvider, CachedEmbeddings
+
+
+class FakeEmbeddingProvider(EmbeddingProvider):
+    """Hashing embeddings that take `latency` seconds per request, like a remote embedding API."""
+
+    cacheable = False
+
+    def __init__(self, latency=0.0, dim=256):
+        self.latency = latency
+        self.hashing = HashingEmbeddingProvider(dim)
+        self.model = f'fake-{self.hashing.model}'
+        self.calls = 0
+
+    def embed(self, texts):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self.hashing.embed(texts)
+
+
+def fake_llm_class():
+    """Builds the fake LLM class on first use, so importing this module does not import LangChain."""
+    from langchain.llms.base import LLM
+
+    class FakeLLM(LLM):
+        """Answers every prompt with a fixed-length reply derived from the prompt's hash after `latency`
+        seconds; when streaming, the latency is spread over the reply's tokens."""
+
+        latency: float = 0.0
+        reply_words: int = 60
+        streaming: bool = False
+
+        @property
+        def _llm_type(self):
+            return 'fake-benchmark'
+
+        def _call(self, prompt, stop=None, run_manager=None, **kwargs):
+            seed = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+            words = [f'{seed[i % 60:i % 60 + 4]}' for i in range(self.reply_words)]
+            if self.streaming and run_manager:
+                for word in words:
+                    time.sleep(self.latency / len(words))
+                    run_manager.on_llm_new_token(word + ' ')
+            elif self.latency:
+                time.sleep(self.latency)
+            return ' '.join(words)
+
+    return FakeLLM
+
+
+def install(llm_latency=0.0, embedding_latency=0.0, reply_words=60):
+    """Replaces ChatOpenAI and the configured embedding backend with the fakes for this process."""
+    import langchain.chat_models
+    from core_functions import ResumeAnalyzer
+
+    FakeLLM = fake_llm_class()
+    provider = FakeEmbeddingProvider(embedding_latency)
+
+    def chat_model(**kwargs):
+        return FakeLLM(latency=llm_latency, reply_words=reply_words, streaming=kwargs.get('streaming', False))
+
+    langchain.chat_models.ChatOpenAI = chat_model
+    ResumeAnalyzer.embeddings = staticmethod(lambda openai_api_key: CachedEmbeddings(provider))
+    return provider
@@ -0,0 +1,173 @@
+"""Local HTTP server that serves saved LinkedIn job search and job posting HTML.
+
+Serves the pages both scraping backends read, filled in with deterministic postings:
+
+- /jobs/search                                  full search results page (Selenium backend)
+- /jobs/view/<slug>-<job id>                    full job page (Selenium backend)
+- /jobs-guest/jobs/api/seeMoreJobPostings/search  guest API result cards, 10 per page (HTTP backend)
+- /jobs-guest/jobs/api/jobPosting/<job id>      guest API job posting (HTTP backend)
+"""
+import os
+import re
+import time
+import threading
+from string import Template
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+PAGE_SIZE = 10
+FIRST_JOB_ID = 3800000000
+
+TITLES = ['Data Scientist', 'Senior Data Scientist', 'Machine Learning Engineer', 'Data Analyst',
+          'Backend Engineer', 'Product Manager']
+COMPANIES = ['Acme Analytics', 'Globex', 'Initech', 'Umbrella Labs', 'Hooli', 'Stark Industries']
+SKILLS = ['Python', 'SQL', 'Spark', 'PyTorch', 'scikit-learn', 'Airflow', 'AWS', 'Docker', 'Kubernetes', 'Tableau']
+
+
+def _template(name):
+    with open(os.path.join(FIXTURES_DIR, name), 'r', encoding='utf-8') as f:
+        return Template(f.read())
+
+
+def _slug(text):
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+
+class FixtureLinkedin:
+    """Deterministic set of postings rendered with the saved LinkedIn page templates."""
+
+    def __init__(self, postings=200, location='Bengaluru, Karnataka, India'):
+        self.location = location
+        self.jobs = []
+        for index in range(postings):
+            title = TITLES[index % len(TITLES)]
+            company = COMPANIES[(index // len(TITLES)) % len(COMPANIES)]
+            skills = [SKILLS[(index + offset) % len(SKILLS)] for offset in range(4)]
+            self.jobs.append({
+                'index': index,
+                'job_id': str(FIRST_JOB_ID + index),
+                'title': title,
+                'company': company,
+                'skills': skills,
+            })
+        self._card = _template('search_card.html')
+        self._search_page = _template('search_page.html')
+        self._posting = _template('job_posting.html')
+        self._view = _template('job_view.html')
+
+    def card(self, job, base_url, position):
+        return self._card.substitute(job_id=job['job_id'], index=job['index'], position=position,
+                                     base_url=base_url, slug=_slug(f"{job['title']} at {job['company']}"),
+                                     title=job['title'], company=job['company'],
+                                     company_slug=_slug(job['company']), location=self.location)
+
+    def search_page(self, base_url, keywords):
+        cards = '\n'.join(self.card(job, base_url, position) for position, job in enumerate(self.jobs, 1))
+        return self._search_page.substitute(keywords=keywords, location=self.location,
+                                            count=len(self.jobs), cards=cards)
+
+    def search_cards(self, base_url, start):
+        jobs = self.jobs[start:start + PAGE_SIZE]
+        return '\n'.join(self.card(job, base_url, position) for position, job in enumerate(jobs, start + 1))
+
+    def posting(self, job):
+        description = '\n'.join([
+            f"<strong>About the role</strong><br>{job['company']} is hiring a {job['title']} "
+            f"(posting {job['index']}) to build data products used by millions of people.<br><br>",
+            '<strong>Requirements</strong>',
+            '<ul>' + ''.join(f"<li>{years} years of experience with {skill}</li>"
+                             for years, skill in enumerate(job['skills'], 2)) + '</ul>',
+            '<strong>Benefits</strong>',
+            '<ul><li>Hybrid work</li><li>Health insurance</li><li>Learning budget</li></ul>',
+        ])
+        return self._posting.substitute(title=job['title'], company=job['company'], location=self.location,
+                                        description=description)
+
+    def view_page(self, job):
+        return self._view.substitute(title=job['title'], company=job['company'], location=self.location,
+                                     posting=self.posting(job))
+
+    def find(self, job_id):
+        index = int(job_id) - FIRST_JOB_ID
+        return self.jobs[index] if 0 <= index < len(self.jobs) else None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        site = self.server.site
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        base_url = f'http://{self.headers["Host"]}'
+        body = None
+        if url.path == '/jobs/search':
+            body = site.search_page(base_url, query.get('keywords', [''])[0])
+        elif url.path == '/jobs-guest/jobs/api/seeMoreJobPostings/search':
+            body = site.search_cards(base_url, int(query.get('start', ['0'])[0]))
+        else:
+            match = re.match(r'^/jobs-guest/jobs/api/jobPosting/(\d+)$', url.path)
+            view = re.match(r'^/jobs/view/(?:.*-)?(\d+)$', url.path)
+            job = site.find((match or view).group(1)) if (match or view) else None
+            if job is not None:
+                body = site.posting(job) if match else site.view_page(job)
+        if body is None:
+            self.send_error(404)
+            return
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class FixtureServer:
+    """Runs the fixture site on a background thread; use as a context manager."""
+
+    def __init__(self, postings=200, latency=0.0, host='127.0.0.1', port=0):
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.site = FixtureLinkedin(postings)
+        self.httpd.latency = latency
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def search_url(self, keywords, location):
+        return f'{self.base_url}/jobs/search?keywords={keywords}&location={location}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Serve the LinkedIn fixture pages locally.')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--postings', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    args = parser.parse_args()
+    server = FixtureServer(args.postings, args.latency, port=args.port)
+    print(f'Serving LinkedIn fixtures at {server.base_url} (LINKEDIN_BASE_URL for the HTTP backend)')
+    server.httpd.serve_forever()
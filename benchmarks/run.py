@@ -0,0 +1,344 @@
+"""Offline benchmark suite: no OpenAI key, no LinkedIn, no network.
+
+OpenAI chat and embedding calls are replaced by deterministic fakes with configurable
+latency, resumes are synthetic PDFs, and LinkedIn is a local server serving saved HTML.
+Results (latency percentiles in milliseconds and throughput) are written as JSON so runs
+can be compared:
+
+    python benchmarks/run.py --output before.json
+    python benchmarks/run.py --output after.json --compare before.json
+    python benchmarks/run.py --suite pdf --suite endpoints --iterations 50 --concurrency 8
+
+Suites: pdf (pdf_to_chunks on 1-50 page PDFs), llm (ResumeAnalyzer.openai), scrape-http
+(LinkedinHttpScraper), scrape-selenium (scrap_company_data / scrap_job_description, skipped
+when Chrome is not installed) and endpoints (/job-recommendations and /linkedin-jobs end to end).
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, REPO_ROOT)
+
+SUITES = ['pdf', 'llm', 'scrape-http', 'scrape-selenium', 'endpoints']
+PERCENTILES = [50, 90, 95, 99]
+JOB_TITLES = ['Data Scientist', 'Machine Learning Engineer']
+JOB_LOCATION = 'Bengaluru'
+
+
+def summarize(latencies, wall, errors=0):
+    """Latency percentiles (ms) and throughput (operations per second of wall time)."""
+    import numpy as np
+    latencies = np.asarray(latencies, dtype=np.float64) * 1000
+    stats = {'count': int(len(latencies)), 'errors': errors, 'wall_seconds': round(wall, 4),
+             'throughput_per_second': round(len(latencies) / wall, 3) if wall > 0 else None}
+    if len(latencies):
+        stats.update({'mean_ms': round(float(latencies.mean()), 3), 'min_ms': round(float(latencies.min()), 3),
+                      'max_ms': round(float(latencies.max()), 3)})
+        for percentile, value in zip(PERCENTILES, np.percentile(latencies, PERCENTILES)):
+            stats[f'p{percentile}_ms'] = round(float(value), 3)
+    return stats
+
+
+def measure(func, iterations, concurrency=1, warmup=1):
+    """Calls func(i) `iterations` times from `concurrency` threads after `warmup` untimed calls."""
+    for i in range(warmup):
+        func(-1 - i)
+    latencies, errors = [], []
+
+    def timed(i):
+        start = time.perf_counter()
+        try:
+            func(i)
+        except Exception as e:
+            errors.append(repr(e))
+            return
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    if concurrency <= 1:
+        for i in range(iterations):
+            timed(i)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(timed, range(iterations)))
+    stats = summarize(latencies, time.perf_counter() - start, len(errors))
+    if errors:
+        stats['first_error'] = errors[0]
+    return stats
+
+
+def measure_async(make_call, iterations, concurrency=1, warmup=1):
+    """Async counterpart of measure: awaits make_call(i) with at most `concurrency` calls in flight."""
+    async def run():
+        for i in range(warmup):
+            await make_call(-1 - i)
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies, errors = [], []
+
+        async def timed(i):
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    await make_call(i)
+                except Exception as e:
+                    errors.append(repr(e))
+                    return
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(timed(i) for i in range(iterations)))
+        stats = summarize(latencies, time.perf_counter() - start, len(errors))
+        if errors:
+            stats['first_error'] = errors[0]
+        return stats
+
+    return run
+
+
+def bench_pdf(args):
+    from synthetic import make_pdf
+    from core_functions import ResumeAnalyzer
+    from pdf_extract import PdfTextExtractor
+    results = {}
+    for pages in args.pdf_pages:
+        data = make_pdf(pages)
+
+        def parse(i, data=data):
+            ResumeAnalyzer._chunk_cache.clear()  # measure parsing, not the chunk cache
+            ResumeAnalyzer.pdf_to_chunks(data)
+
+        results[f'pdf_to_chunks/{pages}_pages'] = measure(parse, args.iterations)
+    data = make_pdf(max(args.pdf_pages))
+    results[f'pdf_to_chunks/{max(args.pdf_pages)}_pages_cached'] = measure(
+        lambda i: ResumeAnalyzer.pdf_to_chunks(data), args.iterations)
+    timings = [timing['seconds'] for timing in PdfTextExtractor.page_timings()]
+    results['pdf_to_chunks/page_extraction'] = summarize(timings, sum(timings))
+    texts = [PdfTextExtractor.extract(make_pdf(pages)) for pages in args.pdf_pages]
+    check_merge_chunks(texts + [paragraph_text(paragraphs) for paragraphs in range(2, 40)])
+    return results
+
+
+def paragraph_text(paragraphs):
+    """Paragraphs the splitter breaks between without overlap, where a chunk ends with "data" and the next
+    starts with "analytics", so a one-letter overlap would glue them into "datanalytics"."""
+    from synthetic import SENTENCES
+    return '\n\n'.join(f'analytics role {paragraph}: '
+                       + ' '.join(SENTENCES[(paragraph * 3 + i) % len(SENTENCES)] for i in range(paragraph % 5 + 1))
+                       + ' data' for paragraph in range(paragraphs))
+
+
+def check_merge_chunks(texts):
+    """Checks that the prompt planner rebuilds each text from the splitter's chunks without losing or gluing
+    words (whitespace aside), since that merged text is what summary prompts send."""
+    import re
+    from core_functions import ResumeAnalyzer
+    from prompt_planner import PromptPlanner
+    normalize = lambda text: re.sub(r'\s+', ' ', text).strip()
+    for text in texts:
+        merged = PromptPlanner.merge_chunks(ResumeAnalyzer.split_text(text))
+        if normalize(merged) != normalize(text):
+            raise AssertionError(f'merge_chunks changed the text of a {len(text)}-character document')
+
+
+def bench_llm(args):
+    from synthetic import make_pdf
+    from core_functions import ResumeAnalyzer
+    chunks = ResumeAnalyzer.pdf_to_chunks(make_pdf(2))
+    prompt = ResumeAnalyzer.summary_prompt(query_with_chunks=chunks)
+    return {'resume_analyzer.openai/summary': measure(
+        lambda i: ResumeAnalyzer.openai('benchmark-key', chunks, prompt), args.iterations, args.concurrency)}
+
+
+def bench_scrape_http(args, server):
+    from http_scraper import LinkedinHttpScraper
+    scraper = LinkedinHttpScraper(base_url=server.base_url)
+    return {f'http_scraper.get_linkedin_jobs/{args.job_count}_jobs': measure(
+        lambda i: scraper.get_linkedin_jobs(JOB_TITLES, JOB_LOCATION, args.job_count), args.iterations)}
+
+
+def bench_scrape_selenium(args, server):
+    from core_functions import LinkedinScraper
+    try:
+        pool = LinkedinScraper.driver_pool()
+        driver = pool.acquire()
+    except Exception as e:
+        reason = str(e).splitlines()[0] if str(e) else repr(e)
+        return {'selenium': {'skipped': f'Chrome is not available: {reason}'}}
+    try:
+        search_url = server.search_url('%20'.join(JOB_TITLES[0].split()), JOB_LOCATION)
+        frames = {}
+
+        def company_data(i):
+            LinkedinScraper.open_link(driver, search_url)
+            frames['df'] = LinkedinScraper.scrap_company_data(driver, JOB_TITLES, JOB_LOCATION)
+
+        def job_descriptions(i):
+            LinkedinScraper.scrap_job_description(driver, frames['df'], args.job_count)
+
+        return {
+            'linkedin_scraper.scrap_company_data': measure(company_data, args.iterations),
+            f'linkedin_scraper.scrap_job_description/{args.job_count}_jobs': measure(job_descriptions,
+                                                                                     args.iterations),
+        }
+    finally:
+        pool.release(driver)
+
+
+def bench_endpoints(args):
+    import httpx
+    import main
+    from synthetic import make_pdf
+    transport = httpx.ASGITransport(app=main.app)
+    pdfs = {}
+
+    def resume(i):
+        # A different resume per request, so the chunk and response caches do not short-circuit the work
+        if i not in pdfs:
+            pdfs[i] = make_pdf(2, candidate=i)
+        return pdfs[i]
+
+    async def post(path, **kwargs):
+        async with httpx.AsyncClient(transport=transport, base_url='http://benchmark', timeout=None) as client:
+            response = await client.post(path, **kwargs)
+        if response.status_code != 200:
+            raise RuntimeError(f'{path} returned {response.status_code}: {response.text[:200]}')
+        return response
+
+    async def job_recommendations(i):
+        await post('/job-recommendations', data={
+            'name': 'Benchmark', 'age': 30, 'gender': 'Other', 'experience': 5, 'job_type': 'Full-time',
+            'location': JOB_LOCATION, 'skills': 'Python, SQL', 'openai_api_key': 'benchmark-key',
+        }, files={'resume': ('resume.pdf', resume(i), 'application/pdf')})
+
+    async def linkedin_jobs(i):
+        await post('/linkedin-jobs', data={'job_titles': ', '.join(JOB_TITLES), 'job_location': JOB_LOCATION,
+                                           'job_count': args.job_count, 'backend': 'http'})
+
+    try:
+        return {
+            'endpoint./job-recommendations': asyncio.run(
+                measure_async(job_recommendations, args.iterations, args.concurrency)()),
+            'endpoint./linkedin-jobs(http)': asyncio.run(
+                measure_async(linkedin_jobs, args.iterations, args.concurrency)()),
+        }
+    finally:
+        main.shutdown_stage_pools()
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(results, baseline_path):
+    """Prints p50/p95 latency and throughput of this run relative to a saved run."""
+    with open(baseline_path, 'r') as f:
+        baseline = json.load(f)['results']
+    print(f'\nCompared with {baseline_path} (ratio new/old; <1 is faster for latency, >1 better for throughput):',
+          file=sys.stderr)
+    for name, stats in results.items():
+        old = baseline.get(name)
+        if not old or 'p50_ms' not in stats or 'p50_ms' not in old:
+            continue
+        ratios = [f"{key}={stats[key] / old[key]:.2f}x" for key in ('p50_ms', 'p95_ms', 'throughput_per_second')
+                  if stats.get(key) and old.get(key)]
+        print(f'  {name:55s} ' + '  '.join(ratios), file=sys.stderr)
+
+
+def print_table(results):
+    print(f"{'benchmark':55s} {'n':>4s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'ops/s':>8s}", file=sys.stderr)
+    for name, stats in results.items():
+        if 'skipped' in stats:
+            print(f'{name:55s} skipped: {stats["skipped"]}', file=sys.stderr)
+            continue
+        print(f"{name:55s} {stats['count']:4d} {stats.get('p50_ms', 0):9.2f} {stats.get('p95_ms', 0):9.2f} "
+              f"{stats.get('p99_ms', 0):9.2f} {stats['throughput_per_second'] or 0:8.2f}"
+              + (f"  ({stats['errors']} errors: {stats.get('first_error')})" if stats['errors'] else ''),
+              file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--suite', action='append', choices=SUITES, help='suite to run (repeatable; default all)')
+    parser.add_argument('--iterations', type=int, default=20, help='timed calls per benchmark (default 20)')
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help='concurrent calls for the llm and endpoint benchmarks (default 4)')
+    parser.add_argument('--pdf-pages', type=int, nargs='+', default=[1, 5, 10, 25, 50])
+    parser.add_argument('--llm-latency', type=float, default=0.05, help='seconds per fake LLM call (default 0.05)')
+    parser.add_argument('--embedding-latency', type=float, default=0.01,
+                        help='seconds per fake embedding request (default 0.01)')
+    parser.add_argument('--page-latency', type=float, default=0.0,
+                        help='seconds the fixture LinkedIn server adds to every response (default 0)')
+    parser.add_argument('--job-count', type=int, default=10, help='postings per scrape (default 10)')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--compare', help='earlier JSON report to compare against')
+    args = parser.parse_args()
+    suites = args.suite or SUITES
+
+    from linkedin_fixture import FixtureServer
+    workdir = tempfile.mkdtemp(prefix='job-recommendation-bench-')
+    server = FixtureServer(latency=args.page_latency).start()
+    # Isolated state, no LLM response cache, and a job store that always refetches descriptions
+    os.environ.update({
+        'LINKEDIN_BASE_URL': server.base_url,
+        'JOB_STORE_PATH': os.path.join(workdir, 'jobs.sqlite3'),
+        'JOB_STORE_MAX_AGE': '0',
+        'JOB_INDEX_DIR': os.path.join(workdir, 'job_index'),
+        'EMBEDDING_CACHE_DIR': os.path.join(workdir, 'embedding_cache'),
+        'LLM_CACHE_BACKEND': 'none',
+        'DRIVER_POOL_MIN': '0',
+    })
+    import fakes
+    fakes.install(llm_latency=args.llm_latency, embedding_latency=args.embedding_latency)
+
+    results = {}
+    try:
+        if 'pdf' in suites:
+            results.update(bench_pdf(args))
+        if 'llm' in suites:
+            results.update(bench_llm(args))
+        if 'scrape-http' in suites:
+            results.update(bench_scrape_http(args, server))
+        if 'scrape-selenium' in suites:
+            results.update(bench_scrape_selenium(args, server))
+        if 'endpoints' in suites:
+            results.update(bench_endpoints(args))
+    finally:
+        server.stop()
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'config': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        },
+        'results': results,
+    }
+    print_table(results)
+    if args.compare:
+        compare(results, args.compare)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Synthetic resume PDFs of any length, written without a PDF library."""
+
+SECTIONS = [
+    'Summary',
+    'Experience',
+    'Projects',
+    'Skills',
+    'Education',
+    'Certifications',
+]
+SENTENCES = [
+    'Designed and operated batch and streaming data pipelines in Python, Spark and Airflow.',
+    'Built machine learning models for churn prediction and demand forecasting with scikit-learn.',
+    'Led a team of four engineers and mentored two interns through their first production releases.',
+    'Reduced cloud spend by 30 percent by right-sizing clusters and caching intermediate results.',
+    'Wrote SQL and dbt models that power the weekly executive dashboards in Tableau.',
+    'Deployed services on AWS with Docker and Kubernetes and set up monitoring with Prometheus.',
+    'Partnered with product managers to define metrics, run A/B tests and present results.',
+    'Migrated a legacy reporting stack to a lakehouse architecture without downtime.',
+]
+LINES_PER_PAGE = 48
+
+
+def resume_lines(page, candidate=0):
+    """Deterministic text lines for one page of candidate number `candidate`'s resume."""
+    lines = [f'Candidate {candidate} - {SECTIONS[page % len(SECTIONS)]} (page {page + 1})']
+    for line in range(LINES_PER_PAGE - 1):
+        lines.append(SENTENCES[(page * 7 + line) % len(SENTENCES)])
+    return lines
+
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def make_pdf(page_count, candidate=0):
+    """Returns the bytes of a text-only resume PDF with page_count pages.
+
+    Different candidate numbers give PDFs with different content (and content hashes).
+    """
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', None,
+               b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    page_ids = []
+    for page in range(page_count):
+        text = b''.join(b'(' + _escape(line).encode('latin-1') + b') Tj T* ' for line in resume_lines(page, candidate))
+        stream = b'BT /F1 9 Tf 14 TL 40 760 Td ' + text + b'ET'
+        objects.append(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+        objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R '
+                       b'/Resources << /Font << /F1 3 0 R >> >> >>' % len(objects))
+        page_ids.append(len(objects))
+    objects[1] = (b'<< /Type /Pages /Kids [' + b' '.join(b'%d 0 R' % page_id for page_id in page_ids)
+                  + b'] /Count %d >>' % page_count)
+
+    pdf = b'%PDF-1.4\n'
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(pdf)
+    pdf += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    pdf += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    pdf += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return pdf
@@ -1,145 +1,497 @@
 import time
 import numpy as np
-import pandas as pd
 import os
-import openai
-from PyPDF2 import PdfReader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.embeddings.openai import OpenAIEmbeddings
-from langchain.vectorstores import FAISS
-from langchain.chat_models import ChatOpenAI
-from langchain.chains.question_answering import load_qa_chain
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.common.exceptions import NoSuchElementException
+import re
+import queue
+import hashlib
+import threading
+import contextvars
+from collections import deque, OrderedDict
+from embeddings import EmbeddingCache, CachedEmbeddings
+from response_cache import ResponseCache
+from driver_pool import DriverPool
+from job_store import JobStore
+from job_matching import JobMatcher
+from pdf_extract import PdfTextExtractor
+from prompt_planner import PromptPlanner
+from rate_governor import RateGovernor, is_rate_limit_error, OPENAI_CHAT_OUTPUT_TOKENS
+from metrics import RESUME_STAGE_SECONDS, SCRAPER_STAGE_SECONDS, SCRAPER_RETRIES, SCRAPER_FAILURES, CACHE_LOOKUPS
 import warnings
 
 warnings.filterwarnings('ignore')
 
+# LangChain, OpenAI, Selenium and pandas take seconds to import, so they are imported
+# where they are first used (or up front by ResumeAnalyzer.preload / LinkedinScraper.preload)
+
+# Number of drivers that fetch job descriptions in parallel for one scrape
+SCRAPE_WORKERS = int(os.getenv('SCRAPE_WORKERS', '4'))
+
+# Explicit page-load waits: per-attempt deadline, retry count and capped exponential backoff
+PAGE_LOAD_TIMEOUT = float(os.getenv('PAGE_LOAD_TIMEOUT', '10'))
+PAGE_LOAD_ATTEMPTS = int(os.getenv('PAGE_LOAD_ATTEMPTS', '4'))
+PAGE_LOAD_BACKOFF = float(os.getenv('PAGE_LOAD_BACKOFF', '1'))
+PAGE_LOAD_BACKOFF_MAX = float(os.getenv('PAGE_LOAD_BACKOFF_MAX', '8'))
+# Most seconds one open_link call spends across all of its attempts and backoffs
+PAGE_LOAD_DEADLINE = float(os.getenv('PAGE_LOAD_DEADLINE', '30'))
+WAIT_POLL_INTERVAL = 0.1
+
+# Chunk lists kept in memory, keyed by the PDF's content hash
+PDF_CHUNK_CACHE_MAX_ENTRIES = int(os.getenv('PDF_CHUNK_CACHE_MAX_ENTRIES', '256'))
+
 
 class ResumeAnalyzer:
     """Class containing functions for resume processing and analysis without Streamlit."""
 
+    _chunk_cache = OrderedDict()
+    _chunk_cache_lock = threading.Lock()
+
+    @staticmethod
+    def read_pdf(pdf):
+        """Returns the bytes of a PDF given as a path, bytes or a file-like object."""
+        if isinstance(pdf, bytes):
+            return pdf
+        if isinstance(pdf, (str, os.PathLike)):
+            with open(pdf, 'rb') as f:
+                return f.read()
+        if hasattr(pdf, 'seek'):
+            pdf.seek(0)
+        return pdf.read()
+
+    @staticmethod
+    def split_text(text):
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+        with RESUME_STAGE_SECONDS.time(stage='split_text'):
+            text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=700,
+                chunk_overlap=200,
+                length_function=len
+            )
+            return text_splitter.split_text(text=text)
+
+    @staticmethod
+    def cached_chunks(digest):
+        with ResumeAnalyzer._chunk_cache_lock:
+            if digest not in ResumeAnalyzer._chunk_cache:
+                CACHE_LOOKUPS.inc(cache='pdf_chunks', result='miss')
+                return None
+            CACHE_LOOKUPS.inc(cache='pdf_chunks', result='hit')
+            ResumeAnalyzer._chunk_cache.move_to_end(digest)
+            return list(ResumeAnalyzer._chunk_cache[digest])
+
+    @staticmethod
+    def cache_chunks(digest, chunks):
+        with ResumeAnalyzer._chunk_cache_lock:
+            ResumeAnalyzer._chunk_cache[digest] = tuple(chunks)
+            ResumeAnalyzer._chunk_cache.move_to_end(digest)
+            while len(ResumeAnalyzer._chunk_cache) > PDF_CHUNK_CACHE_MAX_ENTRIES:
+                ResumeAnalyzer._chunk_cache.popitem(last=False)
+
     @staticmethod
     def pdf_to_chunks(pdf):
-        """Converts a PDF file (file-like object) to text chunks."""
-        pdf_reader = PdfReader(pdf)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=700,
-            chunk_overlap=200,
-            length_function=len
-        )
-        chunks = text_splitter.split_text(text=text)
+        """Converts a PDF file (file-like object, path or bytes) to text chunks.
+
+        Identical PDFs are only parsed and split once; the chunks are cached by content hash.
+        """
+        data = ResumeAnalyzer.read_pdf(pdf)
+        digest = hashlib.sha256(data).hexdigest()
+        chunks = ResumeAnalyzer.cached_chunks(digest)
+        if chunks is None:
+            with RESUME_STAGE_SECONDS.time(stage='pdf_extract'):
+                text = PdfTextExtractor.extract(data)
+            chunks = ResumeAnalyzer.split_text(text)
+            ResumeAnalyzer.cache_chunks(digest, chunks)
         return chunks
 
+    @staticmethod
+    def pdfs_to_chunks(pdfs):
+        """Converts many PDFs to chunk lists, extracting the uncached ones in parallel worker processes.
+
+        Returns one entry per PDF, in order: its chunk list, or the exception that PDF raised.
+        """
+        datas = [ResumeAnalyzer.read_pdf(pdf) for pdf in pdfs]
+        digests = [hashlib.sha256(data).hexdigest() for data in datas]
+        results = [ResumeAnalyzer.cached_chunks(digest) for digest in digests]
+        missing = {}
+        for position, (digest, chunks) in enumerate(zip(digests, results)):
+            if chunks is None:
+                missing.setdefault(digest, []).append(position)
+        with RESUME_STAGE_SECONDS.time(stage='pdf_extract'):
+            texts = PdfTextExtractor.extract_many([datas[positions[0]] for positions in missing.values()])
+        for (digest, positions), text in zip(missing.items(), texts):
+            if isinstance(text, Exception):
+                chunks = text
+            else:
+                chunks = ResumeAnalyzer.split_text(text)
+                ResumeAnalyzer.cache_chunks(digest, chunks)
+            for position in positions:
+                results[position] = chunks
+        return results
+
+    @staticmethod
+    def token_usage():
+        """Returns the input/output token counts and latency of recent LLM calls."""
+        return PromptPlanner.token_usage()
+
+    @staticmethod
+    def pdf_page_timings():
+        """Returns the most recent per-page PDF text extraction times."""
+        return PdfTextExtractor.page_timings()
+
+    @staticmethod
+    def preload():
+        """Imports the LangChain, OpenAI, PyPDF2 and faiss modules resume analysis needs, so the first request does
+        not pay for it."""
+        import openai
+        import faiss
+        from PyPDF2 import PdfReader
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+        from langchain.vectorstores import FAISS
+        from langchain.chat_models import ChatOpenAI
+        from langchain.chains.question_answering import load_qa_chain
+        from langchain.callbacks.base import BaseCallbackHandler
+
+    @staticmethod
+    def embeddings(openai_api_key):
+        """Returns the configured embedding backend (OpenAI by default) behind the shared embedding cache."""
+        return CachedEmbeddings.from_config(openai_api_key)
+
+    @staticmethod
+    def embedding_cache_stats():
+        """Returns hit/miss counters for every embedding cache used in this process."""
+        return [cache.stats() for cache in EmbeddingCache._instances.values()]
+
+    @staticmethod
+    def response_cache_stats():
+        """Returns hit/miss counters for the LLM response cache, or None when it is disabled."""
+        cache = ResponseCache.shared()
+        return cache.stats() if cache is not None else None
+
     @staticmethod
     def openai(openai_api_key, chunks, analyze):
         """Uses OpenAI's API to process the chunks with a given analysis prompt."""
-        try:
-            embeddings = OpenAIEmbeddings(openai_api_key=openai_api_key)
-            vectorstores = FAISS.from_texts(chunks, embedding=embeddings)
-            docs = vectorstores.similarity_search(query=analyze, k=3)
-            llm = ChatOpenAI(
-                model='gpt-3.5-turbo', 
-                api_key=openai_api_key,
-                temperature=0.7
-            )
-            chain = load_qa_chain(llm=llm, chain_type='stuff')
-            response = chain.run(input_documents=docs, question=analyze)
-            return response
-        except Exception as e:
-            from openai import OpenAIError, RateLimitError, APIError, APIConnectionError
-            if isinstance(e, (OpenAIError, RateLimitError, APIError, APIConnectionError)):
-                print(f"OpenAI API Error: {str(e)}")
-            else:
-                print(f"An error occurred: {str(e)}")
-            raise Exception("Failed to process with OpenAI API. Please check your API key and try again.")
+        return ResumeSession(openai_api_key, chunks).analyze(analyze)
+
+    @staticmethod
+    def raise_openai_error(e):
+        """Logs an OpenAI/LangChain failure and re-raises it as a user-facing error."""
+        from openai import OpenAIError, RateLimitError, APIError, APIConnectionError
+        if isinstance(e, (OpenAIError, RateLimitError, APIError, APIConnectionError)):
+            print(f"OpenAI API Error: {str(e)}")
+        else:
+            print(f"An error occurred: {str(e)}")
+        if is_rate_limit_error(e):
+            # Still rate limited after the rate governor's retries
+            raise Exception("OpenAI rate limit reached. Please try again in a minute.")
+        raise Exception("Failed to process with OpenAI API. Please check your API key and try again.")
 
     @staticmethod
     def summary_prompt(query_with_chunks):
         """Generates a summarization prompt for a resume based on given text chunks."""
-        query = f''' need to detailed summarization of below resume and finally conclude them
+        template = '''need to detailed summarization of below resume and finally conclude them
 
-                    """"""""""""""""""""""""""""""""""""""""""""""""""""
-                    {query_with_chunks}
-                    """""""""""""""""""""""""""""""""""""""""""""""""""""
-                    '''
-        return query
+""""""""""""""""""""""""""""""""""""""""""""""""""""
+{context}
+""""""""""""""""""""""""""""""""""""""""""""""""""""
+'''
+        return PromptPlanner.build(template, query_with_chunks, ResumeSession.model)
 
     @staticmethod
     def strength_prompt(query_with_chunks):
         """Generates a prompt to analyze strengths from the resume text chunks."""
-        query = f'''need to detailed analysis and explain of the strength of below resume and finally conclude them
-                    """"""""""""""""""""""""""""""""""""""""""""""""""""
-                    {query_with_chunks}
-                    """""""""""""""""""""""""""""""""""""""""""""""""""""
-                    '''
-        return query
+        template = '''need to detailed analysis and explain of the strength of below resume and finally conclude them
+""""""""""""""""""""""""""""""""""""""""""""""""""""
+{context}
+""""""""""""""""""""""""""""""""""""""""""""""""""""
+'''
+        return PromptPlanner.build(template, query_with_chunks, ResumeSession.model)
 
     @staticmethod
     def weakness_prompt(query_with_chunks):
         """Generates a prompt to analyze weaknesses and improvement suggestions from the resume text chunks."""
-        query = f'''need to detailed analysis and explain of the weakness of below resume and how to improve make a better resume.
+        template = '''need to detailed analysis and explain of the weakness of below resume and how to improve make a better resume.
 
-                    """"""""""""""""""""""""""""""""""""""""""""""""""""
-                    {query_with_chunks}
-                    """""""""""""""""""""""""""""""""""""""""""""""""""""
-                    '''
-        return query
+""""""""""""""""""""""""""""""""""""""""""""""""""""
+{context}
+""""""""""""""""""""""""""""""""""""""""""""""""""""
+'''
+        return PromptPlanner.build(template, query_with_chunks, ResumeSession.model)
 
     @staticmethod
     def job_title_prompt(query_with_chunks):
         """Generates a prompt to suggest job roles based on the resume text chunks."""
-        query = f''' what are the job roles i apply to likedin based on below?
-                    
-                    """"""""""""""""""""""""""""""""""""""""""""""""""""
-                    {query_with_chunks}
-                    """"""""""""""""""""""""""""""""""""""""""""""""""""
-                    '''
-        return query
+        template = '''what are the job roles i apply to likedin based on below?
+
+""""""""""""""""""""""""""""""""""""""""""""""""""""
+{context}
+""""""""""""""""""""""""""""""""""""""""""""""""""""
+'''
+        return PromptPlanner.build(template, query_with_chunks, ResumeSession.model)
 
     @staticmethod
     def job_recommendation_prompt(user_details, resume_summary):
         """Generates a job recommendation prompt using user details and a resume summary."""
-        query = f'''Based on the following user details and resume summary, suggest specific job roles and skills to focus on:
-                    
-                    User Details:
-                    Name: {user_details['name']}
-                    Age: {user_details['age']}
-                    Gender: {user_details['gender']}
-                    Experience: {user_details['experience']} years
-                    Preferred Job Types: {', '.join(user_details['job_type'])}
-                    Location: {user_details['location']}
-                    Skills: {user_details['skills']}
-                    
-                    Resume Summary:
-                    {resume_summary}
-                    
-                    Please provide:
-                    1. Recommended job titles
-                    2. Key skills to highlight
-                    3. Suggested job search keywords
-                    '''
-        return query
+        template = f'''Based on the following user details and resume summary, suggest specific job roles and skills to focus on:
+
+User Details:
+Name: {user_details['name']}
+Age: {user_details['age']}
+Gender: {user_details['gender']}
+Experience: {user_details['experience']} years
+Preferred Job Types: {', '.join(user_details['job_type'])}
+Location: {user_details['location']}
+Skills: {user_details['skills']}
+
+Resume Summary:
+{{context}}
+
+Please provide:
+1. Recommended job titles
+2. Key skills to highlight
+3. Suggested job search keywords
+'''
+        return PromptPlanner.build(template, resume_summary, ResumeSession.model)
+
+
+class ResumeSession:
+    """Embeds a resume's chunks once and answers any number of analysis prompts against that index."""
+
+    model = 'gpt-3.5-turbo'
+    temperature = 0.7
+
+    def __init__(self, openai_api_key, chunks, use_cache=True, chunk_vectors=None):
+        self.openai_api_key = openai_api_key
+        self.chunks = chunks
+        self.use_cache = use_cache
+        self.response_cache = ResponseCache.shared()
+        self.governor = RateGovernor.shared('chat', openai_api_key)
+        from langchain.vectorstores import FAISS
+        from langchain.chat_models import ChatOpenAI
+        from langchain.chains.question_answering import load_qa_chain
+        try:
+            self.embeddings = ResumeAnalyzer.embeddings(openai_api_key)
+            if chunk_vectors is None:
+                with RESUME_STAGE_SECONDS.time(stage='embed'):
+                    chunk_vectors = self.embeddings.embed_array(chunks)
+            # Vectors may also be given already embedded (e.g. in one batch with other resumes)
+            with RESUME_STAGE_SECONDS.time(stage='index_build'):
+                self.vectorstores = FAISS.from_embeddings(
+                    list(zip(chunks, np.asarray(chunk_vectors).tolist())), embedding=self.embeddings)
+            # Rate limit and transient errors are retried by the rate governor, not per client
+            self.llm = ChatOpenAI(
+                model=self.model,
+                api_key=openai_api_key,
+                temperature=self.temperature,
+                max_retries=0
+            )
+            self.chain = load_qa_chain(llm=self.llm, chain_type='stuff')
+            self.streaming_llm = ChatOpenAI(
+                model=self.model,
+                api_key=openai_api_key,
+                temperature=self.temperature,
+                streaming=True,
+                max_retries=0
+            )
+            self.streaming_chain = load_qa_chain(llm=self.streaming_llm, chain_type='stuff')
+        except Exception as e:
+            ResumeAnalyzer.raise_openai_error(e)
+
+    @classmethod
+    def from_pdf(cls, openai_api_key, pdf):
+        """Builds a session straight from a PDF file (file-like object)."""
+        return cls(openai_api_key, ResumeAnalyzer.pdf_to_chunks(pdf))
+
+    @classmethod
+    def from_batch(cls, openai_api_key, chunk_lists, use_cache=True):
+        """Builds one session per chunk list, embedding the chunks of every resume in one batched call."""
+        embeddings = ResumeAnalyzer.embeddings(openai_api_key)
+        try:
+            with RESUME_STAGE_SECONDS.time(stage='embed'):
+                vectors = embeddings.embed_array([chunk for chunks in chunk_lists for chunk in chunks])
+        except Exception as e:
+            ResumeAnalyzer.raise_openai_error(e)
+        sessions, start = [], 0
+        for chunks in chunk_lists:
+            sessions.append(cls(openai_api_key, chunks, use_cache, vectors[start:start + len(chunks)]))
+            start += len(chunks)
+        return sessions
+
+    def reserve_tokens(self, analyze, docs):
+        """Tokens the rate governor reserves for one LLM call, before the response length is known."""
+        return PromptPlanner.input_tokens(self.model, analyze, docs) + OPENAI_CHAT_OUTPUT_TOKENS
+
+    def retrieve(self, analyze):
+        """Returns the resume chunks most relevant to the prompt that it does not already contain,
+        limited to what fits in the prompt token budget."""
+        with RESUME_STAGE_SECONDS.time(stage='retrieve'):
+            docs = self.vectorstores.similarity_search(query=analyze, k=3)
+        return PromptPlanner.select_docs(docs, analyze, self.model)
+
+    def analyze(self, analyze, use_cache=None):
+        """Retrieves the most relevant chunks for the prompt and runs it through the LLM.
+
+        Responses are served from the shared response cache when possible; passing
+        use_cache=False skips the lookup but still refreshes the cached response.
+        """
+        if use_cache is None:
+            use_cache = self.use_cache
+        try:
+            start = time.perf_counter()
+            docs = self.retrieve(analyze)
+            cache_key = None
+            if self.response_cache is not None:
+                cache_key = ResponseCache.key(self.model, self.temperature, analyze, docs)
+                if use_cache:
+                    cached = self.response_cache.get(cache_key)
+                    if cached is not None:
+                        PromptPlanner.record(self.model, analyze, docs, cached, time.perf_counter() - start, cached=True)
+                        return cached
+            reserved = self.reserve_tokens(analyze, docs)
+            with RESUME_STAGE_SECONDS.time(stage='llm'):
+                response = self.governor.call(lambda: self.chain.run(input_documents=docs, question=analyze), reserved)
+            usage = PromptPlanner.record(self.model, analyze, docs, response, time.perf_counter() - start)
+            self.governor.adjust_tokens(usage['input_tokens'] + usage['output_tokens'] - reserved)
+            if cache_key is not None:
+                self.response_cache.set(cache_key, response)
+            return response
+        except Exception as e:
+            ResumeAnalyzer.raise_openai_error(e)
+
+    def stream(self, analyze, use_cache=None):
+        """Same as analyze, but yields the response token by token as the LLM generates it.
+
+        A cached response is yielded as a single piece.
+        """
+        if use_cache is None:
+            use_cache = self.use_cache
+        start = time.perf_counter()
+        try:
+            docs = self.retrieve(analyze)
+        except Exception as e:
+            ResumeAnalyzer.raise_openai_error(e)
+        cache_key = None
+        if self.response_cache is not None:
+            cache_key = ResponseCache.key(self.model, self.temperature, analyze, docs)
+            if use_cache:
+                cached = self.response_cache.get(cache_key)
+                if cached is not None:
+                    PromptPlanner.record(self.model, analyze, docs, cached, time.perf_counter() - start, cached=True)
+                    yield cached
+                    return
+
+        # The chain runs on its own thread and hands tokens over through a queue
+        tokens = queue.Queue()
+        result = {}
+        handler = _token_queue_handler(tokens)
+        reserved = self.reserve_tokens(analyze, docs)
+
+        def run_chain():
+            try:
+                with RESUME_STAGE_SECONDS.time(stage='llm'):
+                    # Only retried while nothing has been streamed, so no token is sent twice
+                    result['response'] = self.governor.call(
+                        lambda: self.streaming_chain.run(input_documents=docs, question=analyze, callbacks=[handler]),
+                        reserved, retry_if=lambda e: handler.token_count == 0)
+            except Exception as e:
+                result['error'] = e
+            finally:
+                tokens.put(_STREAM_END)
+
+        # With a copy of this context, so the call keeps its rate governor priority
+        context = contextvars.copy_context()
+        threading.Thread(target=context.run, args=(run_chain,), daemon=True).start()
+        while True:
+            token = tokens.get()
+            if token is _STREAM_END:
+                break
+            yield token
+        if 'error' in result:
+            ResumeAnalyzer.raise_openai_error(result['error'])
+        usage = PromptPlanner.record(self.model, analyze, docs, result['response'], time.perf_counter() - start)
+        self.governor.adjust_tokens(usage['input_tokens'] + usage['output_tokens'] - reserved)
+        if cache_key is not None:
+            self.response_cache.set(cache_key, result['response'])
+
+
+_STREAM_END = object()
+
+
+def _token_queue_handler(tokens):
+    """Returns a LangChain callback handler that forwards each newly generated LLM token to a queue."""
+    from langchain.callbacks.base import BaseCallbackHandler
+
+    class TokenQueueHandler(BaseCallbackHandler):
+        token_count = 0
+
+        def on_llm_new_token(self, token, **kwargs):
+            self.token_count += 1
+            tokens.put(token)
+
+    return TokenQueueHandler()
 
 
 class LinkedinScraper:
     """Class containing functions for scraping LinkedIn jobs without Streamlit."""
 
+    _driver_pool = None
+    _driver_pool_lock = threading.Lock()
+    _load_timings = deque(maxlen=500)
+
+    page_ready_selector = 'span.switcher-tabs__placeholder-text.m-auto'
+    show_more_selector = 'button[data-tracking-control-name="public_jobs_show-more-html-btn"]'
+    description_selector = 'div.show-more-less-html__markup.relative.overflow-hidden'
+
+    # Walks each search result card and reads its fields from that card only
+    job_cards_script = """
+        const text = (card, selector) => {
+            const element = card.querySelector(selector);
+            return element ? element.innerText.trim() : null;
+        };
+        return Array.from(document.querySelectorAll('.base-search-card'), card => {
+            const link = card.matches('a[href*="/jobs/"]') ? card : card.querySelector('a[href*="/jobs/"]');
+            const urnHolder = card.closest('[data-entity-urn]');
+            const urn = urnHolder ? urnHolder.getAttribute('data-entity-urn') : null;
+            return {
+                company: text(card, 'h4.base-search-card__subtitle'),
+                title: text(card, 'h3.base-search-card__title'),
+                location: text(card, 'span.job-search-card__location'),
+                url: link ? link.href : null,
+                job_id: urn ? urn.split(':').pop() : null
+            };
+        });
+    """
+
+    @staticmethod
+    def driver_pool():
+        """Returns the process-wide pool of headless Chrome drivers."""
+        with LinkedinScraper._driver_pool_lock:
+            if LinkedinScraper._driver_pool is None:
+                LinkedinScraper._driver_pool = DriverPool(LinkedinScraper.webdriver_setup)
+            return LinkedinScraper._driver_pool
+
+    @staticmethod
+    def preload():
+        """Imports Selenium, pandas, httpx and lxml, so the first scrape (with either backend) does not pay for it."""
+        import pandas
+        import httpx
+        from lxml import html
+        from selenium import webdriver
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.common.keys import Keys
+        from selenium.common.exceptions import TimeoutException
+
     @staticmethod
     def webdriver_setup():
         """Sets up a headless Chrome WebDriver."""
-        options = webdriver.ChromeOptions()
-        options.add_argument('--headless')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        driver = webdriver.Chrome(options=options)
-        driver.maximize_window()
-        return driver
+        from selenium import webdriver
+        with SCRAPER_STAGE_SECONDS.time(backend='selenium', stage='driver_start'):
+            options = webdriver.ChromeOptions()
+            options.add_argument('--headless')
+            options.add_argument('--no-sandbox')
+            options.add_argument('--disable-dev-shm-usage')
+            driver = webdriver.Chrome(options=options)
+            driver.maximize_window()
+            driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+            return driver
 
     @staticmethod
     def build_url(job_title, job_location):
@@ -154,22 +506,97 @@ class LinkedinScraper:
         return link
 
     @staticmethod
-    def open_link(driver, link):
-        """Opens a link using the driver. Continues trying until a specific element is found."""
+    def wait_for(driver, css_selector, timeout, condition=None):
+        """Polls until an element matching the selector is present (and satisfies `condition`, if given).
+
+        Returns the element as soon as it appears, or None once `timeout` seconds have passed.
+        """
+        from selenium.webdriver.common.by import By
+        deadline = time.monotonic() + timeout
         while True:
-            try:
-                driver.get(link)
-                driver.implicitly_wait(5)
-                time.sleep(3)
-                driver.find_element(by=By.CSS_SELECTOR, value='span.switcher-tabs__placeholder-text.m-auto')
-                return
-            except NoSuchElementException:
-                continue
+            for element in driver.find_elements(by=By.CSS_SELECTOR, value=css_selector):
+                if condition is None or condition(element):
+                    return element
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(WAIT_POLL_INTERVAL)
+
+    @staticmethod
+    def open_link(driver, link, timeout=PAGE_LOAD_TIMEOUT, attempts=PAGE_LOAD_ATTEMPTS, deadline=PAGE_LOAD_DEADLINE):
+        """Opens a link and waits for the job page to render, reloading with capped exponential backoff.
+
+        Every attempt, wait and backoff is cut short so the whole call takes at most `deadline` seconds.
+        Raises TimeoutException if the page is still not ready after `attempts` loads or once the deadline passes.
+        """
+        from selenium.common.exceptions import TimeoutException, WebDriverException
+        # Presence is polled explicitly; an implicit wait would stall every empty poll
+        driver.implicitly_wait(0)
+        start = time.monotonic()
+        end = start + deadline
+        page_load_timeout = PAGE_LOAD_TIMEOUT  # what webdriver_setup configured
+        last_error = None
+        attempt = 0
+        try:
+            while attempt < attempts and time.monotonic() < end:
+                attempt += 1
+                remaining = end - time.monotonic()
+                try:
+                    if remaining < page_load_timeout:
+                        page_load_timeout = max(remaining, WAIT_POLL_INTERVAL)
+                        driver.set_page_load_timeout(page_load_timeout)
+                    driver.get(link)
+                    wait = min(timeout, end - time.monotonic())
+                    if wait > 0 and LinkedinScraper.wait_for(driver, LinkedinScraper.page_ready_selector, wait) is not None:
+                        LinkedinScraper._record_load(link, start, attempt, loaded=True)
+                        return
+                except WebDriverException as e:
+                    # e.g. the page load timed out or the connection reset; treat it as a failed attempt
+                    last_error = e
+                if attempt < attempts:
+                    time.sleep(max(0.0, min(PAGE_LOAD_BACKOFF_MAX, PAGE_LOAD_BACKOFF * 2 ** (attempt - 1),
+                                            end - time.monotonic())))
+        finally:
+            if page_load_timeout != PAGE_LOAD_TIMEOUT:
+                try:
+                    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+                except WebDriverException:
+                    pass
+        LinkedinScraper._record_load(link, start, attempt, loaded=False)
+        seconds = time.monotonic() - start
+        raise TimeoutException(f"Page did not load after {attempt} attempts in {seconds:.1f}s: {link}") from last_error
+
+    @staticmethod
+    def _record_load(link, start, attempts, loaded):
+        seconds = time.monotonic() - start
+        LinkedinScraper._load_timings.append({
+            'url': link,
+            'seconds': seconds,
+            'attempts': attempts,
+            'loaded': loaded,
+        })
+        SCRAPER_STAGE_SECONDS.observe(seconds, backend='selenium', stage='page_load')
+        if attempts > 1:
+            SCRAPER_RETRIES.inc(attempts - 1, backend='selenium')
+        if not loaded:
+            SCRAPER_FAILURES.inc(backend='selenium')
+
+    @staticmethod
+    def load_timings():
+        """Returns the most recent page loads with their wall-clock time and attempt count."""
+        return list(LinkedinScraper._load_timings)
 
     @staticmethod
     def link_open_scrolldown(driver, link, job_count):
         """Opens the link and scrolls down the page to load more jobs."""
         LinkedinScraper.open_link(driver, link)
+        with SCRAPER_STAGE_SECONDS.time(backend='selenium', stage='scroll'):
+            LinkedinScraper.scroll_down(driver, job_count)
+
+    @staticmethod
+    def scroll_down(driver, job_count):
+        """Scrolls the open search page down job_count times, dismissing the sign-in modal and loading more jobs."""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.common.keys import Keys
         for _ in range(0, job_count):
             body = driver.find_element(by=By.TAG_NAME, value='body')
             body.send_keys(Keys.PAGE_UP)
@@ -186,92 +613,222 @@ class LinkedinScraper:
             except Exception:
                 pass
 
+    @staticmethod
+    def compile_title_matcher(user_job_title_input):
+        """Compiles the user's job titles into one case-insensitive regex.
+
+        A scraped title matches when it contains every word of at least one user title
+        (as substrings, in any order); a blank user title matches every job.
+        """
+        alternatives = []
+        for term in user_job_title_input:
+            words = term.lower().split()
+            alternatives.append(''.join(f'(?=.*?{re.escape(word)})' for word in words))
+        if not alternatives:
+            return re.compile(r'(?!)')
+        return re.compile('^(?:' + '|'.join(alternatives) + ')', re.IGNORECASE | re.DOTALL)
+
     @staticmethod
     def job_title_filter(scrap_job_title, user_job_title_input):
         """Filters a scraped job title based on user input. Returns the title if it matches, else NaN."""
-        user_input = [i.lower().strip() for i in user_job_title_input]
-        scrap_title = [scrap_job_title.lower().strip()]
-        confirmation_count = 0
-        for term in user_input:
-            if all(word in scrap_title[0] for word in term.split()):
-                confirmation_count += 1
-        if confirmation_count > 0:
-            return scrap_job_title
-        else:
-            return np.nan
+        matcher = LinkedinScraper.compile_title_matcher(user_job_title_input)
+        return scrap_job_title if matcher.search(scrap_job_title.strip()) else np.nan
 
     @staticmethod
-    def scrap_company_data(driver, job_title_input, job_location):
-        """Scrapes company data (company name, job title, location, website URL) from the current page."""
-        companies = driver.find_elements(by=By.CSS_SELECTOR, value='h4.base-search-card__subtitle')
-        company_names = [elem.text for elem in companies]
-
-        locations = driver.find_elements(by=By.CSS_SELECTOR, value='span.job-search-card__location')
-        company_locations = [elem.text for elem in locations]
-
-        titles = driver.find_elements(by=By.CSS_SELECTOR, value='h3.base-search-card__title')
-        job_titles = [elem.text for elem in titles]
-
-        urls = driver.find_elements(by=By.XPATH, value='//a[contains(@href, "/jobs/")]')
-        website_urls = [elem.get_attribute('href') for elem in urls]
-        
-        df = pd.DataFrame(company_names, columns=['Company Name'])
-        df['Job Title'] = pd.DataFrame(job_titles)
-        df['Location'] = pd.DataFrame(company_locations)
-        df['Website URL'] = pd.DataFrame(website_urls)
-        df['Job Title'] = df['Job Title'].apply(lambda x: LinkedinScraper.job_title_filter(x, job_title_input))
-        df['Location'] = df['Location'].apply(lambda x: x if job_location.lower() in x.lower() else np.nan)
-        df = df.dropna()
+    def filter_jobs(df, job_title_input, job_location):
+        """Keeps rows whose title matches the user's titles and whose location contains job_location, in one vectorized pass."""
+        matcher = LinkedinScraper.compile_title_matcher(job_title_input)
+        title_match = df['Job Title'].astype(str).str.contains(matcher, na=False)
+        location_match = df['Location'].astype(str).str.lower().str.contains(job_location.lower(), regex=False, na=False)
+        return df[title_match & location_match]
+
+    @staticmethod
+    def parse_job_id(url):
+        """Extracts the numeric LinkedIn job id from a job posting URL, or None if there is none."""
+        if not url:
+            return None
+        match = re.search(r'currentJobId=(\d+)', url) or re.search(r'/jobs/view/(?:[^/?#]*?-)?(\d+)', url)
+        return match.group(1) if match else None
+
+    @staticmethod
+    def extract_job_cards(driver):
+        """Reads every job card on the current page in a single WebDriver round trip.
+
+        Returns a list of {company, title, location, url, job_id} dicts, each built from one card.
+        """
+        with SCRAPER_STAGE_SECONDS.time(backend='selenium', stage='job_cards'):
+            cards = driver.execute_script(LinkedinScraper.job_cards_script) or []
+        for card in cards:
+            if not card.get('job_id'):
+                card['job_id'] = LinkedinScraper.parse_job_id(card.get('url'))
+        return cards
+
+    @staticmethod
+    def build_job_frame(cards, job_title_input, job_location):
+        """Turns job cards into the scraper's DataFrame, keeping only titles and locations the user asked for."""
+        import pandas as pd
+        df = pd.DataFrame([[card.get('company'), card.get('title'), card.get('location'), card.get('url'), card.get('job_id')]
+                           for card in cards],
+                          columns=['Company Name', 'Job Title', 'Location', 'Website URL', 'Job ID'])
+        df = df.dropna(subset=['Company Name', 'Job Title', 'Location', 'Website URL'])
+        df = LinkedinScraper.filter_jobs(df, job_title_input, job_location)
         df.reset_index(drop=True, inplace=True)
         return df
 
     @staticmethod
-    def scrap_job_description(driver, df, job_count):
-        """Scrapes job descriptions for each job posting in the DataFrame."""
+    def scrap_company_data(driver, job_title_input, job_location):
+        """Scrapes company data (company name, job title, location, website URL, job id) from the current page."""
+        cards = LinkedinScraper.extract_job_cards(driver)
+        return LinkedinScraper.build_job_frame(cards, job_title_input, job_location)
+
+    @staticmethod
+    def fetch_job_description(driver, url):
+        """Opens a job posting and returns its description text, or None if it is not available."""
+        with SCRAPER_STAGE_SECONDS.time(backend='selenium', stage='description'):
+            return LinkedinScraper._fetch_job_description(driver, url)
+
+    @staticmethod
+    def _fetch_job_description(driver, url):
+        try:
+            LinkedinScraper.open_link(driver, url)
+            show_more = LinkedinScraper.wait_for(driver, LinkedinScraper.show_more_selector, PAGE_LOAD_TIMEOUT)
+            if show_more is None:
+                return None
+            show_more.click()
+            # Hidden elements report empty text, so wait until the expanded description is visible
+            description = LinkedinScraper.wait_for(driver, LinkedinScraper.description_selector, PAGE_LOAD_TIMEOUT,
+                                                   condition=lambda elem: elem.text.strip())
+            return description.text if description is not None else None
+        except Exception:
+            return None
+
+    @staticmethod
+    def scrap_job_description(driver, df, job_count, workers=SCRAPE_WORKERS):
+        """Scrapes job descriptions for each job posting in the DataFrame.
+
+        Descriptions the job store already holds (and that are not stale) are reused; the
+        rest are fetched by up to `workers` drivers in parallel: the given driver plus extra
+        ones leased from the driver pool. Results keep the DataFrame's row order, and
+        outstanding fetches are cancelled once `job_count` descriptions have been collected.
+        """
         website_urls = df['Website URL'].tolist()
-        job_descriptions = []
-        description_count = 0
+        stored = LinkedinScraper.stored_descriptions(df)
+        fetched = {}
+        pending = queue.Queue()
+        for index, (url, job_id) in enumerate(zip(website_urls, df['Job ID'])):
+            if job_id in stored:
+                fetched[index] = stored[job_id]
+            else:
+                pending.put((index, url))
+        fetched_cond = threading.Condition()
+        enough = threading.Event()
+
+        def fetch_pending(worker_driver):
+            while not enough.is_set():
+                try:
+                    index, url = pending.get_nowait()
+                except queue.Empty:
+                    return
+                description = None
+                try:
+                    description = LinkedinScraper.fetch_job_description(worker_driver, url)
+                finally:
+                    with fetched_cond:
+                        fetched[index] = description
+                        fetched_cond.notify()
 
-        for url in website_urls:
+        def fetch_with_pooled_driver():
             try:
-                LinkedinScraper.open_link(driver, url)
-                driver.find_element(by=By.CSS_SELECTOR, value='button[data-tracking-control-name="public_jobs_show-more-html-btn"]').click()
-                driver.implicitly_wait(5)
-                time.sleep(1)
-                description_elements = driver.find_elements(by=By.CSS_SELECTOR, value='div.show-more-less-html__markup.relative.overflow-hidden')
-                data = [elem.text for elem in description_elements][0]
-                
-                if len(data.strip()) > 0 and data not in job_descriptions:
-                    job_descriptions.append(data)
-                    description_count += 1
-                else:
-                    job_descriptions.append('Description Not Available')
+                with LinkedinScraper.driver_pool().lease(timeout=0) as pooled_driver:
+                    fetch_pending(pooled_driver)
             except Exception:
-                job_descriptions.append('Description Not Available')
-            if description_count == job_count:
-                break
+                pass  # no spare driver right now; the other workers pick up the slack
 
+        threads = [threading.Thread(target=fetch_pending, args=(driver,), daemon=True)]
+        for _ in range(min(workers, len(website_urls)) - 1):
+            threads.append(threading.Thread(target=fetch_with_pooled_driver, daemon=True))
+        for thread in threads:
+            thread.start()
+
+        # Consume results in row order, exactly as a sequential scrape would
+        job_descriptions = []
+        seen_descriptions = set()
+        description_count = 0
+        try:
+            with fetched_cond:
+                for index in range(len(website_urls)):
+                    while index not in fetched:
+                        fetched_cond.wait()
+                    data = fetched[index]
+                    if data is not None and data not in seen_descriptions:
+                        seen_descriptions.add(data)
+                        job_descriptions.append(data)
+                        description_count += 1
+                    else:
+                        job_descriptions.append('Description Not Available')
+                    if description_count == job_count:
+                        break
+        finally:
+            enough.set()
+            for thread in threads:
+                thread.join()
+
+        LinkedinScraper.remember_jobs(df, fetched, stored)
+        return LinkedinScraper.attach_descriptions(df, job_descriptions)
+
+    @staticmethod
+    def stored_descriptions(df):
+        """Returns {job_id: description} for the DataFrame's postings that the job store holds fresh descriptions for."""
+        job_ids = df['Job ID'].dropna().tolist()
+        stored = JobStore.shared().fresh_descriptions(job_ids)
+        CACHE_LOOKUPS.inc(len(stored), cache='job_store', result='hit')
+        CACHE_LOOKUPS.inc(len(job_ids) - len(stored), cache='job_store', result='miss')
+        return stored
+
+    @staticmethod
+    def remember_jobs(df, fetched, stored):
+        """Bulk-upserts the scraped postings, with descriptions fetched this run (by row position), into the job store.
+
+        Postings without a job id (NaN in the DataFrame) are skipped.
+        """
+        import pandas as pd
+        columns = df[['Company Name', 'Job Title', 'Location', 'Website URL', 'Job ID']].itertuples(index=False)
+        jobs = [{'job_id': job_id, 'company': company, 'title': title, 'location': location, 'url': url,
+                 'description': None if job_id in stored else fetched.get(index)}
+                for index, (company, title, location, url, job_id) in enumerate(columns) if pd.notna(job_id)]
+        JobStore.shared().upsert_many(jobs)
+        try:
+            JobMatcher.update_index()
+        except Exception as e:
+            # Indexing is best effort; the postings are stored and the next update picks them up
+            print(f"Could not update the job index: {str(e)}")
+
+    @staticmethod
+    def attach_descriptions(df, job_descriptions):
+        """Adds descriptions to the first len(job_descriptions) rows and drops rows without one."""
+        import pandas as pd
         df = df.iloc[:len(job_descriptions), :]
         df['Job Description'] = pd.DataFrame(job_descriptions, columns=['Description'])
         df['Job Description'] = df['Job Description'].apply(lambda x: np.nan if x == 'Description Not Available' else x)
-        df = df.dropna()
+        df = df.dropna(subset=['Job Description'])
         df.reset_index(drop=True, inplace=True)
         return df
 
     @staticmethod
     def get_linkedin_jobs(job_titles_list, job_location, job_count):
         """Combines the scraping functions to return a DataFrame of LinkedIn job postings."""
-        driver = None
-        try:
-            driver = LinkedinScraper.webdriver_setup()
-            link = LinkedinScraper.build_url(job_titles_list, job_location)
-            LinkedinScraper.link_open_scrolldown(driver, link, job_count)
-            df = LinkedinScraper.scrap_company_data(driver, job_titles_list, job_location)
-            df_final = LinkedinScraper.scrap_job_description(driver, df, job_count)
-            return df_final
-        finally:
-            if driver:
-                driver.quit()
+        with SCRAPER_STAGE_SECONDS.time(backend='selenium', stage='total'):
+            pool = LinkedinScraper.driver_pool()
+            with SCRAPER_STAGE_SECONDS.time(backend='selenium', stage='driver_lease'):
+                driver = pool.acquire()
+            try:
+                link = LinkedinScraper.build_url(job_titles_list, job_location)
+                LinkedinScraper.link_open_scrolldown(driver, link, job_count)
+                df = LinkedinScraper.scrap_company_data(driver, job_titles_list, job_location)
+                df_final = LinkedinScraper.scrap_job_description(driver, df, job_count)
+                return df_final
+            finally:
+                pool.release(driver)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,184 @@
+import os
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+
+DRIVER_POOL_MIN = int(os.getenv('DRIVER_POOL_MIN', '1'))
+DRIVER_POOL_MAX = int(os.getenv('DRIVER_POOL_MAX', '4'))
+DRIVER_MAX_USES = int(os.getenv('DRIVER_MAX_USES', '20'))
+DRIVER_LEASE_TIMEOUT = float(os.getenv('DRIVER_LEASE_TIMEOUT', '120'))
+
+
+class DriverPoolTimeout(Exception):
+    """Raised when no driver becomes available within the lease timeout."""
+
+
+class _PooledDriver:
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+
+
+class DriverPool:
+    """Bounded pool of reusable WebDriver instances.
+
+    Drivers are health-checked when leased, have their cookies and storage reset
+    when returned, and are recycled after ``max_uses`` leases.
+    """
+
+    def __init__(self, factory, min_size=DRIVER_POOL_MIN, max_size=DRIVER_POOL_MAX,
+                 max_uses=DRIVER_MAX_USES, lease_timeout=DRIVER_LEASE_TIMEOUT):
+        self.factory = factory
+        self.min_size = min(min_size, max_size)
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self.lease_timeout = lease_timeout
+        self._idle = deque()
+        self._leased = {}
+        self._size = 0  # idle + leased + being created
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def warm(self):
+        """Starts drivers until the pool holds at least min_size of them."""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                entry = _PooledDriver(self.factory())
+            except Exception:
+                self._forget()
+                raise
+            with self._cond:
+                self._idle.append(entry)
+                self._cond.notify()
+
+    def acquire(self, timeout=None):
+        """Leases a healthy driver, starting a new one if the pool is below max_size."""
+        timeout = self.lease_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            entry = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError('Driver pool is closed')
+                    if self._idle:
+                        entry = self._idle.popleft()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise DriverPoolTimeout(f'No Chrome driver became available within {timeout:g}s')
+                    self._cond.wait(remaining)
+
+            if entry is None:
+                try:
+                    entry = _PooledDriver(self.factory())
+                except Exception:
+                    self._forget()
+                    raise
+            elif not self._healthy(entry.driver):
+                self._discard(entry)
+                continue
+
+            with self._cond:
+                self._leased[id(entry.driver)] = entry
+            return entry.driver
+
+    def release(self, driver):
+        """Returns a leased driver, resetting it or recycling it once it has been used max_uses times."""
+        with self._cond:
+            entry = self._leased.pop(id(driver))
+        entry.uses += 1
+        if self._closed or entry.uses >= self.max_uses or not self._reset(driver):
+            self._discard(entry)
+            self._replenish()
+            return
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """Context manager that leases a driver and always returns it to the pool."""
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def close(self):
+        """Quits idle drivers; drivers still leased are quit when they are released."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for entry in idle:
+            self._discard(entry)
+
+    def stats(self):
+        """Current pool occupancy."""
+        with self._cond:
+            return {'size': self._size, 'idle': len(self._idle), 'leased': len(self._leased),
+                    'min_size': self.min_size, 'max_size': self.max_size}
+
+    @staticmethod
+    def _healthy(driver):
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _reset(driver):
+        """Clears cookies, storage and extra tabs so the next lease starts from a blank browser."""
+        try:
+            try:
+                driver.execute_script('window.localStorage.clear(); window.sessionStorage.clear();')
+            except Exception:
+                pass  # storage is not accessible on some pages (e.g. about:blank)
+            driver.delete_all_cookies()
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.get('about:blank')
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, entry):
+        try:
+            entry.driver.quit()
+        except Exception:
+            pass
+        self._forget()
+
+    def _forget(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _replenish(self):
+        """Tops the pool back up to min_size in the background after a driver is recycled."""
+        with self._cond:
+            if self._closed or self._size >= self.min_size:
+                return
+
+        def warm_quietly():
+            try:
+                self.warm()
+            except Exception as e:
+                print(f"Could not start a replacement Chrome driver: {str(e)}")
+
+        threading.Thread(target=warm_quietly, daemon=True).start()
@@ -0,0 +1,394 @@
+import os
+import re
+import json
+import time
+import zlib
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+from metrics import CACHE_LOOKUPS
+from prompt_planner import PromptPlanner
+from rate_governor import RateGovernor
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to the in-process lock only
+    fcntl = None
+
+
+EMBEDDING_CACHE_DIR = os.getenv('EMBEDDING_CACHE_DIR', '.embedding_cache')
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv('EMBEDDING_CACHE_MAX_ENTRIES', '20000'))
+# Seconds between index rewrites that only record which entries were recently used
+EMBEDDING_CACHE_RECENCY_FLUSH = float(os.getenv('EMBEDDING_CACHE_RECENCY_FLUSH', '30'))
+
+EMBEDDING_BACKEND = os.getenv('EMBEDDING_BACKEND', 'openai')  # 'openai', 'hashing' or 'sentence-transformers'
+EMBEDDING_BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', '256'))
+HASHING_EMBEDDING_DIM = int(os.getenv('HASHING_EMBEDDING_DIM', '1024'))
+LOCAL_EMBEDDING_MODEL = os.getenv('LOCAL_EMBEDDING_MODEL', 'all-MiniLM-L6-v2')  # model name or on-disk path
+
+
+class EmbeddingCache:
+    """On-disk LRU cache of embedding vectors keyed by (model, sha256(text)).
+
+    Vectors live in a memory-mapped float32 matrix (``vectors.f32``) with one row
+    per entry; ``index.json`` maps each text hash to its row in LRU order.
+    Hits only reorder the in-memory index; the new order is written along with the
+    next store, or by a lookup at most every ``recency_flush`` seconds.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, model, cache_dir=EMBEDDING_CACHE_DIR, max_entries=EMBEDDING_CACHE_MAX_ENTRIES,
+                 recency_flush=EMBEDDING_CACHE_RECENCY_FLUSH):
+        self.model = model
+        self.max_entries = max_entries
+        self.recency_flush = recency_flush
+        self.directory = os.path.join(cache_dir, re.sub(r'[^A-Za-z0-9_.-]', '_', model))
+        self.index_path = os.path.join(self.directory, 'index.json')
+        self.vectors_path = os.path.join(self.directory, 'vectors.f32')
+        self.lock_path = os.path.join(self.directory, '.lock')
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.miss_seconds = 0.0
+
+        self._lock = threading.RLock()
+        self._entries = OrderedDict()  # key -> row, least recently used first
+        self._dim = None
+        self._capacity = max_entries
+        self._vectors = None
+        self._index_mtime = None
+        self._touched = OrderedDict()  # keys hit since the index was last written, least recent first
+        self._written_at = time.monotonic()
+
+    @classmethod
+    def shared(cls, model):
+        """Returns the process-wide cache for a model."""
+        with cls._instances_lock:
+            if model not in cls._instances:
+                cls._instances[model] = cls(model)
+            return cls._instances[model]
+
+    @staticmethod
+    def key(text):
+        """Content hash used as the cache key for a text."""
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def _file_lock(self):
+        """Cross-process lock so several workers can share one cache directory."""
+        return FileLock(self.lock_path)
+
+    def _open_vectors(self, dim):
+        mode = 'r+' if os.path.exists(self.vectors_path) else 'w+'
+        self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode=mode,
+                                  shape=(self._capacity, dim))
+        self._dim = dim
+
+    def _reset(self):
+        self._entries = OrderedDict()
+        self._dim = None
+        self._vectors = None
+        self._capacity = self.max_entries
+        for path in (self.index_path, self.vectors_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _refresh(self):
+        """Reloads the index if another process has rewritten it since we last read it."""
+        try:
+            mtime = os.stat(self.index_path).st_mtime_ns
+        except FileNotFoundError:
+            if self._index_mtime is not None:
+                self._reset()
+                self._index_mtime = None
+            return
+        if mtime == self._index_mtime:
+            return
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+            dim, capacity = index['dim'], index['capacity']
+            if capacity != self.max_entries or not os.path.exists(self.vectors_path):
+                raise ValueError('cache layout changed')
+            self._capacity = capacity
+            if self._dim != dim or self._vectors is None:
+                self._open_vectors(dim)
+            self._entries = OrderedDict((key, row) for key, row in index['entries'])
+            # Keep the hits this process has not written yet on top of the other process's order
+            for key in list(self._touched):
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                else:
+                    del self._touched[key]
+            self._index_mtime = mtime
+        except (ValueError, KeyError, TypeError):
+            # Corrupt or incompatible cache: start over rather than serve wrong vectors.
+            self._reset()
+            self._index_mtime = None
+
+    def _write_index(self):
+        self._vectors.flush()
+        tmp_path = f'{self.index_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'dim': self._dim, 'capacity': self._capacity,
+                       'entries': list(self._entries.items())}, f)
+        os.replace(tmp_path, self.index_path)
+        self._index_mtime = os.stat(self.index_path).st_mtime_ns
+        self._touched.clear()
+        self._written_at = time.monotonic()
+
+    def lookup(self, texts):
+        """Returns (positions of cached texts, their vectors as one float32 matrix, positions of missing texts)."""
+        positions, rows, missing = [], [], []
+        with self._lock, self._file_lock():
+            self._refresh()
+            for position, text in enumerate(texts):
+                key = self.key(text)
+                row = self._entries.get(key)
+                if row is None:
+                    missing.append(position)
+                    continue
+                self._entries.move_to_end(key)
+                self._touched[key] = None
+                self._touched.move_to_end(key)
+                positions.append(position)
+                rows.append(row)
+            # One fancy-indexed gather copies every hit out of the memory map at once
+            vectors = self._vectors[rows] if rows else np.empty((0, self._dim or 0), dtype=np.float32)
+            self.hits += len(positions)
+            self.misses += len(missing)
+            CACHE_LOOKUPS.inc(len(positions), cache='embeddings', result='hit')
+            CACHE_LOOKUPS.inc(len(missing), cache='embeddings', result='miss')
+            if self._touched and time.monotonic() - self._written_at >= self.recency_flush:
+                self._write_index()
+        return positions, vectors, missing
+
+    def flush(self):
+        """Writes recency changes from lookups that have not been written yet."""
+        with self._lock:
+            if not self._touched or self._vectors is None:
+                return
+            with self._file_lock():
+                self._refresh()
+                if self._vectors is not None:
+                    self._write_index()
+
+    def store(self, texts, vectors):
+        """Adds vectors for texts, evicting least recently used entries when full."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(texts) == 0:
+            return
+        with self._lock, self._file_lock():
+            self._refresh()
+            if self._vectors is None:
+                self._reset()  # drop any orphaned matrix left without an index
+                self._open_vectors(vectors.shape[1])
+            elif vectors.shape[1] != self._dim:
+                raise ValueError(f'Embedding dimension {vectors.shape[1]} does not match cache dimension {self._dim}')
+            used_rows = set(self._entries.values())
+            free_rows = (row for row in range(self._capacity) if row not in used_rows)
+            for text, vector in zip(texts, vectors):
+                key = self.key(text)
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    continue
+                row = next(free_rows, None)
+                if row is None:
+                    _, row = self._entries.popitem(last=False)
+                    self.evictions += 1
+                self._vectors[row] = vector
+                self._entries[key] = row
+            self._write_index()
+
+    def record_miss_time(self, seconds):
+        """Accumulates time spent embedding cache misses, used to estimate savings."""
+        with self._lock:
+            self.miss_seconds += seconds
+
+    def stats(self):
+        """Hit/miss counters for this process plus an estimate of embedding time saved."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            seconds_per_miss = self.miss_seconds / self.misses if self.misses else 0.0
+            return {
+                'model': self.model,
+                'entries': len(self._entries),
+                'capacity': self._capacity,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'miss_seconds': self.miss_seconds,
+                'estimated_saved_seconds': self.hits * seconds_per_miss,
+            }
+
+
+class FileLock:
+    """Exclusive flock on a lock file; a no-op where fcntl is unavailable."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self._file = open(self.path, 'a')
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+
+class EmbeddingProvider:
+    """Interface for embedding backends.
+
+    `model` names the vector space (it keys the embedding cache) and `embed` returns a
+    float32 array with one row per text. `cacheable` is False for backends that are
+    cheaper to recompute than to look up.
+    """
+
+    model = None
+    cacheable = True
+
+    def embed(self, texts):
+        raise NotImplementedError
+
+    @staticmethod
+    def from_config(openai_api_key=None, backend=None):
+        """Builds the provider selected by EMBEDDING_BACKEND (or `backend`)."""
+        backend = backend or EMBEDDING_BACKEND
+        if backend == 'openai':
+            return OpenAIEmbeddingProvider(openai_api_key)
+        if backend == 'hashing':
+            return HashingEmbeddingProvider()
+        if backend == 'sentence-transformers':
+            return SentenceTransformerProvider()
+        raise ValueError(f"Unknown EMBEDDING_BACKEND '{backend}'")
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """Embeds through the OpenAI embeddings API (the default backend)."""
+
+    def __init__(self, openai_api_key):
+        from langchain.embeddings.openai import OpenAIEmbeddings
+        # Rate limit and transient errors are retried by the rate governor, not per client
+        self.embeddings = OpenAIEmbeddings(openai_api_key=openai_api_key, chunk_size=EMBEDDING_BATCH_SIZE,
+                                           max_retries=0)
+        self.model = self.embeddings.model
+        self.governor = RateGovernor.shared('embeddings', openai_api_key)
+
+    def embed(self, texts):
+        texts = list(texts)
+        tokens = sum(PromptPlanner.count(text, self.model) for text in texts)
+        requests = -(-len(texts) // EMBEDDING_BATCH_SIZE)
+        return self.governor.call(
+            lambda: np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32), tokens, requests)
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """In-process embeddings from signed feature hashing of word unigrams and bigrams.
+
+    No model or network access is needed; vectors use sublinear term frequencies and are
+    L2-normalized, so cosine similarity reflects shared vocabulary.
+    """
+
+    cacheable = False
+    _token_pattern = re.compile(r'[a-z0-9][a-z0-9+#.]*')
+
+    def __init__(self, dim=HASHING_EMBEDDING_DIM):
+        self.dim = dim
+        self.model = f'hashing-{dim}'
+
+    def embed(self, texts):
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = self._token_pattern.findall(text.lower())
+            features = tokens + [f'{first} {second}' for first, second in zip(tokens, tokens[1:])]
+            if not features:
+                continue
+            # crc32 is stable across processes, unlike hash()
+            hashes = np.fromiter((zlib.crc32(feature.encode('utf-8')) for feature in features),
+                                 dtype=np.uint32, count=len(features))
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+            np.add.at(matrix[row], hashes % self.dim, signs)
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+
+class SentenceTransformerProvider(EmbeddingProvider):
+    """Embeds with a small local sentence-embedding model (requires the optional sentence-transformers package)."""
+
+    _models = {}
+    _models_lock = threading.Lock()
+
+    def __init__(self, model_name_or_path=LOCAL_EMBEDDING_MODEL):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise ImportError("EMBEDDING_BACKEND=sentence-transformers needs the sentence-transformers package: "
+                              "pip install sentence-transformers")
+        with self._models_lock:
+            if model_name_or_path not in self._models:
+                self._models[model_name_or_path] = SentenceTransformer(model_name_or_path, device='cpu')
+        self.encoder = self._models[model_name_or_path]
+        self.model = f'sentence-transformers-{os.path.basename(model_name_or_path.rstrip("/"))}'
+
+    def embed(self, texts):
+        vectors = self.encoder.encode(list(texts), batch_size=EMBEDDING_BATCH_SIZE,
+                                      convert_to_numpy=True, normalize_embeddings=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class CachedEmbeddings:
+    """LangChain embeddings over an EmbeddingProvider that only sends cache misses to the provider.
+
+    Implements LangChain's Embeddings interface (embed_documents / embed_query) by duck typing,
+    so importing this module does not import LangChain.
+    """
+
+    def __init__(self, provider, cache=None):
+        self.provider = provider
+        self.cache = cache
+
+    @classmethod
+    def from_config(cls, openai_api_key=None, backend=None):
+        """Builds the configured provider, backed by its shared on-disk cache when the provider is worth caching."""
+        provider = EmbeddingProvider.from_config(openai_api_key, backend)
+        cache = EmbeddingCache.shared(provider.model) if provider.cacheable else None
+        return cls(provider, cache)
+
+    def embed_array(self, texts):
+        """Embeds texts as a float32 matrix with one row per text, in order."""
+        if self.cache is None:
+            return self.provider.embed(texts)
+        positions, cached, missing = self.cache.lookup(texts)
+        if not missing:
+            return np.asarray(cached, dtype=np.float32)
+        # Embed each distinct missing text once, even if it repeats in the batch.
+        unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+        start = time.perf_counter()
+        new_vectors = self.provider.embed(unique_texts)
+        self.cache.record_miss_time(time.perf_counter() - start)
+        self.cache.store(unique_texts, new_vectors)
+        row_of = {text: row for row, text in enumerate(unique_texts)}
+        matrix = np.empty((len(texts), new_vectors.shape[1]), dtype=np.float32)
+        if positions:
+            matrix[positions] = cached
+        matrix[missing] = new_vectors[[row_of[texts[i]] for i in missing]]
+        return matrix
+
+    def embed_documents(self, texts):
+        return self.embed_array(texts).tolist()
+
+    def embed_query(self, text):
+        # Queries are one-off prompts: caching them would cost an index write per call and evict chunk vectors
+        return self.provider.embed([text])[0].tolist()
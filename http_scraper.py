@@ -0,0 +1,225 @@
+import os
+import asyncio
+from urllib.parse import urlencode
+from core_functions import LinkedinScraper, PAGE_LOAD_TIMEOUT, PAGE_LOAD_ATTEMPTS, PAGE_LOAD_BACKOFF, PAGE_LOAD_BACKOFF_MAX
+from metrics import SCRAPER_STAGE_SECONDS, SCRAPER_RETRIES, SCRAPER_FAILURES
+
+
+LINKEDIN_BASE_URL = os.getenv('LINKEDIN_BASE_URL', 'https://www.linkedin.com')
+HTTP_SCRAPER_CONCURRENCY = int(os.getenv('HTTP_SCRAPER_CONCURRENCY', '8'))
+HTTP_SEARCH_MAX_PAGES = int(os.getenv('HTTP_SEARCH_MAX_PAGES', '10'))
+HTTP_SEARCH_PAGE_SIZE = 10
+USER_AGENT = ('Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/120.0 Safari/537.36')
+
+
+def _has_class(class_name):
+    """XPath predicate matching elements whose class list contains class_name."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+class LinkedinHttpScraper:
+    """Scrapes public LinkedIn guest job listings over plain HTTP, without a browser.
+
+    Has the same get_linkedin_jobs(job_titles_list, job_location, job_count) contract as
+    LinkedinScraper. Search pages and job descriptions are fetched concurrently over
+    one pooled keep-alive client and parsed with lxml. httpx and lxml are imported on
+    first use, so creating a scraper at API startup costs nothing.
+    """
+
+    def __init__(self, base_url=LINKEDIN_BASE_URL, concurrency=HTTP_SCRAPER_CONCURRENCY):
+        self.base_url = base_url.rstrip('/')
+        self.concurrency = concurrency
+        self._client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    @property
+    def client(self):
+        if self._client is None:
+            import httpx
+            self._client = httpx.AsyncClient(
+                headers={'User-Agent': USER_AGENT},
+                timeout=PAGE_LOAD_TIMEOUT,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=self.concurrency,
+                                    max_keepalive_connections=self.concurrency),
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def search_url(self, job_titles_list, job_location, start):
+        """Builds the guest search API URL for one page of results."""
+        query = urlencode({
+            'keywords': ', '.join(title.strip() for title in job_titles_list),
+            'location': job_location,
+            'geoId': '102713980',
+            'f_TPR': 'r604800',
+            'start': start,
+        })
+        return f"{self.base_url}/jobs-guest/jobs/api/seeMoreJobPostings/search?{query}"
+
+    def job_posting_url(self, job_id):
+        return f"{self.base_url}/jobs-guest/jobs/api/jobPosting/{job_id}"
+
+    async def fetch(self, url):
+        """GETs a page, retrying rate limits, server errors and timeouts with capped exponential backoff.
+
+        Returns the response text, or None for pages that do not exist.
+        """
+        import httpx
+        with SCRAPER_STAGE_SECONDS.time(backend='http', stage='page_load'):
+            for attempt in range(1, PAGE_LOAD_ATTEMPTS + 1):
+                try:
+                    response = await self.client.get(url)
+                    if response.status_code == 404:
+                        return None
+                    if response.status_code != 429 and response.status_code < 500:
+                        response.raise_for_status()
+                        return response.text
+                except httpx.TransportError:
+                    if attempt == PAGE_LOAD_ATTEMPTS:
+                        SCRAPER_FAILURES.inc(backend='http')
+                        raise
+                if attempt < PAGE_LOAD_ATTEMPTS:
+                    SCRAPER_RETRIES.inc(backend='http')
+                    await asyncio.sleep(min(PAGE_LOAD_BACKOFF_MAX, PAGE_LOAD_BACKOFF * 2 ** (attempt - 1)))
+            SCRAPER_FAILURES.inc(backend='http')
+            response.raise_for_status()
+
+    @staticmethod
+    def parse_job_cards(page):
+        """Parses search result HTML into {company, title, location, url, job_id} dicts."""
+        if not page or not page.strip():
+            return []
+        from lxml import html
+        tree = html.fromstring(page)
+        cards = []
+        for card in tree.xpath(f"//*[{_has_class('base-search-card')}]"):
+            def text(xpath):
+                found = card.xpath(xpath)
+                return found[0].text_content().strip() if found else None
+
+            if card.tag == 'a' and '/jobs/' in card.get('href', ''):
+                url = card.get('href')
+            else:
+                links = card.xpath(".//a[contains(@href, '/jobs/')]/@href")
+                url = links[0] if links else None
+            urn_holder = card.xpath('ancestor-or-self::*[@data-entity-urn][1]/@data-entity-urn')
+            job_id = urn_holder[0].split(':')[-1] if urn_holder else LinkedinScraper.parse_job_id(url)
+            cards.append({
+                'company': text(f".//h4[{_has_class('base-search-card__subtitle')}]"),
+                'title': text(f".//h3[{_has_class('base-search-card__title')}]"),
+                'location': text(f".//span[{_has_class('job-search-card__location')}]"),
+                'url': url,
+                'job_id': job_id,
+            })
+        return cards
+
+    @staticmethod
+    def parse_job_description(page):
+        """Extracts the description text from a job posting page, or None if it has none."""
+        if not page:
+            return None
+        from lxml import html
+        tree = html.fromstring(page)
+        markup = tree.xpath(f"//div[{_has_class('show-more-less-html__markup')}]")
+        if not markup:
+            return None
+        lines = (line.strip() for line in markup[0].itertext())
+        data = '\n'.join(line for line in lines if line)
+        return data if data else None
+
+    async def search_job_cards(self, job_titles_list, job_location, job_count):
+        """Fetches search pages a batch at a time until job_count matching cards are found or results run out."""
+        cards, seen_urls = [], set()
+        matching = 0
+        page = 0
+        while page < HTTP_SEARCH_MAX_PAGES and matching < job_count:
+            batch = range(page, min(page + self.concurrency, HTTP_SEARCH_MAX_PAGES))
+            pages = await asyncio.gather(*(
+                self.fetch(self.search_url(job_titles_list, job_location, number * HTTP_SEARCH_PAGE_SIZE))
+                for number in batch))
+            page = batch.stop
+            exhausted = False
+            for page_html in pages:
+                page_cards = self.parse_job_cards(page_html)
+                if not page_cards:
+                    exhausted = True
+                    break
+                for card in page_cards:
+                    if card['url'] and card['url'] not in seen_urls:
+                        seen_urls.add(card['url'])
+                        cards.append(card)
+            # pandas filtering and SQLite lookups block, so they run on a thread instead of the event loop
+            frame = await asyncio.to_thread(LinkedinScraper.build_job_frame, cards, job_titles_list, job_location)
+            matching = len(frame)
+            if exhausted:
+                break
+        return cards
+
+    async def fetch_job_description(self, semaphore, job_id, url):
+        async with semaphore:
+            with SCRAPER_STAGE_SECONDS.time(backend='http', stage='description'):
+                try:
+                    page = await self.fetch(self.job_posting_url(job_id) if job_id else url)
+                    return self.parse_job_description(page)
+                except Exception:
+                    return None
+
+    async def scrap_job_description(self, df, job_count):
+        """Fetches descriptions concurrently, keeping row order and cancelling the rest once job_count are found.
+
+        Fresh descriptions already in the job store are reused instead of fetched.
+        """
+        stored = await asyncio.to_thread(LinkedinScraper.stored_descriptions, df)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = [None if job_id in stored else asyncio.ensure_future(self.fetch_job_description(semaphore, job_id, url))
+                 for job_id, url in zip(df['Job ID'], df['Website URL'])]
+        job_descriptions = []
+        fetched = {}
+        seen_descriptions = set()
+        description_count = 0
+        try:
+            for index, (task, job_id) in enumerate(zip(tasks, df['Job ID'])):
+                if task is None:
+                    data = stored[job_id]
+                else:
+                    data = fetched[index] = await task
+                if data is not None and data not in seen_descriptions:
+                    seen_descriptions.add(data)
+                    job_descriptions.append(data)
+                    description_count += 1
+                else:
+                    job_descriptions.append('Description Not Available')
+                if description_count == job_count:
+                    break
+        finally:
+            for task in tasks:
+                if task is not None:
+                    task.cancel()
+        await asyncio.to_thread(LinkedinScraper.remember_jobs, df, fetched, stored)
+        return await asyncio.to_thread(LinkedinScraper.attach_descriptions, df, job_descriptions)
+
+    async def aget_linkedin_jobs(self, job_titles_list, job_location, job_count):
+        """Async version of get_linkedin_jobs; reuses this scraper's pooled connections."""
+        with SCRAPER_STAGE_SECONDS.time(backend='http', stage='total'):
+            with SCRAPER_STAGE_SECONDS.time(backend='http', stage='search'):
+                cards = await self.search_job_cards(job_titles_list, job_location, job_count)
+            df = await asyncio.to_thread(LinkedinScraper.build_job_frame, cards, job_titles_list, job_location)
+            return await self.scrap_job_description(df, job_count)
+
+    def get_linkedin_jobs(self, job_titles_list, job_location, job_count):
+        """Returns a DataFrame of LinkedIn job postings, like LinkedinScraper.get_linkedin_jobs."""
+        async def run():
+            async with LinkedinHttpScraper(self.base_url, self.concurrency) as scraper:
+                return await scraper.aget_linkedin_jobs(job_titles_list, job_location, job_count)
+        return asyncio.run(run())
@@ -0,0 +1,280 @@
+import os
+import re
+import json
+import threading
+import numpy as np
+from embeddings import FileLock
+
+
+JOB_INDEX_DIR = os.getenv('JOB_INDEX_DIR', '.job_index')
+JOB_INDEX_NLIST = int(os.getenv('JOB_INDEX_NLIST', '256'))
+JOB_INDEX_NPROBE = int(os.getenv('JOB_INDEX_NPROBE', '16'))
+JOB_INDEX_FLUSH_INTERVAL = float(os.getenv('JOB_INDEX_FLUSH_INTERVAL', '30'))
+
+# k-means wants roughly 39 training points per IVF list; smaller corpora use an exact flat index
+_MIN_POINTS_PER_LIST = 39
+
+
+class JobVectorIndex:
+    """Persistent inner-product ANN index of job posting vectors, keyed by LinkedIn job id.
+
+    The index lives on disk and every process memory-maps it read-only. add() and
+    remove() are buffered in memory (and visible to this process's searches right
+    away); flush() merges them into the on-disk index under a cross-process lock and
+    atomically replaces the file, retraining the IVF lists when the corpus has doubled
+    since the last training. A background thread flushes periodically.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, model, index_dir=JOB_INDEX_DIR, nlist=JOB_INDEX_NLIST, nprobe=JOB_INDEX_NPROBE):
+        self.model = model
+        self.nlist = nlist
+        self.nprobe = nprobe
+        os.makedirs(index_dir, exist_ok=True)
+        base = os.path.join(index_dir, re.sub(r'[^A-Za-z0-9_.-]', '_', model))
+        self.index_path = base + '.faiss'
+        self.meta_path = base + '.json'
+        self.lock_path = base + '.lock'
+        self.centroids_path = base + '.centroids.npy'
+
+        self._lock = threading.RLock()
+        self._index = None
+        self._ids = np.empty(0, dtype=np.int64)
+        self._index_mtime = None
+        self._pending = {}  # job id -> normalized vector waiting to be flushed
+        self._removed = set()
+        self._cursor = None  # (described_at, job_id) of the last job store posting added, see ingest_cursor
+        self._flusher = None
+
+    @classmethod
+    def shared(cls, model):
+        """Returns the process-wide index for an embedding model, with its background flusher running."""
+        with cls._instances_lock:
+            if model not in cls._instances:
+                index = cls(model)
+                index.start_background_flush()
+                cls._instances[model] = index
+            return cls._instances[model]
+
+    @staticmethod
+    def normalize(vectors):
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+    def _refresh(self):
+        """Re-maps the on-disk index if another process (or a flush) has replaced it."""
+        try:
+            stat = os.stat(self.index_path)
+        except FileNotFoundError:
+            return
+        # Flushes replace the file, so a new inode or mtime means a new index
+        mtime = (stat.st_ino, stat.st_mtime_ns)
+        if mtime == self._index_mtime:
+            return
+        import faiss  # deferred so importing the API does not load faiss until an index is used
+        mmap_flag = getattr(faiss, 'IO_FLAG_MMAP_IFC', faiss.IO_FLAG_MMAP)
+        index = faiss.read_index(self.index_path, mmap_flag | faiss.IO_FLAG_READ_ONLY)
+        ids, _ = self._export(index, with_vectors=False)
+        if isinstance(index, faiss.IndexIVF):
+            index.nprobe = self.nprobe
+        self._index, self._ids, self._index_mtime = index, ids, mtime
+
+    @staticmethod
+    def _export(index, with_vectors=True):
+        """Returns (ids, vectors) of everything stored in a flat or IVF index."""
+        import faiss
+        if isinstance(index, faiss.IndexIDMap2):
+            ids = faiss.vector_to_array(index.id_map).astype(np.int64)
+            vectors = index.index.reconstruct_n(0, index.ntotal) if with_vectors else None
+            return ids, vectors
+        ivf = faiss.extract_index_ivf(index)
+        invlists = ivf.invlists
+        id_parts, vector_parts = [], []
+        for list_no in range(ivf.nlist):
+            size = invlists.list_size(list_no)
+            if size == 0:
+                continue
+            id_parts.append(np.array(faiss.rev_swig_ptr(invlists.get_ids(list_no), size), dtype=np.int64))
+            if with_vectors:
+                codes = faiss.rev_swig_ptr(invlists.get_codes(list_no), size * invlists.code_size)
+                vector_parts.append(np.array(codes).view(np.float32).reshape(size, ivf.d))
+        ids = np.concatenate(id_parts) if id_parts else np.empty(0, dtype=np.int64)
+        if not with_vectors:
+            return ids, None
+        vectors = np.concatenate(vector_parts) if vector_parts else np.empty((0, ivf.d), dtype=np.float32)
+        return ids, vectors
+
+    def __contains__(self, job_id):
+        with self._lock:
+            self._refresh()
+            job_id = int(job_id)
+            if job_id in self._pending:
+                return True
+            return job_id not in self._removed and bool(np.isin(job_id, self._ids))
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            on_disk = self._index.ntotal if self._index is not None else 0
+            return int(on_disk) + len(self._pending)
+
+    def ingest_cursor(self):
+        """Returns the (described_at, job_id) position in the job store up to which postings have been added,
+        by this process or (once flushed) by any other."""
+        with self._lock:
+            flushed = tuple(self._read_meta().get('ingested_through') or (0.0, ''))
+            self._cursor = max(self._cursor or flushed, flushed)
+            return self._cursor
+
+    def add(self, job_ids, vectors, cursor=None):
+        """Queues vectors for job ids (replacing any existing vector for the same id).
+
+        `cursor` advances the ingest cursor to the job store position of the last posting added.
+        """
+        vectors = self.normalize(vectors)
+        with self._lock:
+            for job_id, vector in zip(job_ids, vectors):
+                self._pending[int(job_id)] = vector
+                self._removed.discard(int(job_id))
+            if cursor is not None:
+                self._cursor = max(self._cursor or tuple(cursor), tuple(cursor))
+
+    def remove(self, job_ids):
+        """Queues job ids for removal."""
+        with self._lock:
+            for job_id in job_ids:
+                self._pending.pop(int(job_id), None)
+                self._removed.add(int(job_id))
+
+    def search(self, query, k):
+        """Returns (job_ids, scores) of the k nearest postings by cosine similarity, best first."""
+        query = self.normalize(np.atleast_2d(query))
+        with self._lock:
+            self._refresh()
+            scores, ids = [], []
+            if self._index is not None and self._index.ntotal:
+                # Over-fetch so ids shadowed by pending removals or replacements do not shrink the result
+                fetch = min(self._index.ntotal, k + len(self._removed) + len(self._pending))
+                found_scores, found_ids = self._index.search(query, fetch)
+                for score, job_id in zip(found_scores[0], found_ids[0]):
+                    if job_id >= 0 and job_id not in self._removed and job_id not in self._pending:
+                        scores.append(float(score))
+                        ids.append(int(job_id))
+            if self._pending:
+                pending_ids = list(self._pending)
+                pending_scores = np.stack([self._pending[job_id] for job_id in pending_ids]) @ query[0]
+                scores.extend(pending_scores.tolist())
+                ids.extend(pending_ids)
+        order = np.argsort(-np.asarray(scores, dtype=np.float32))[:k]
+        return [ids[i] for i in order], [scores[i] for i in order]
+
+    def flush(self):
+        """Merges pending adds/removes into the on-disk index, retraining or compacting when due."""
+        with self._lock:
+            if not self._pending and not self._removed:
+                return
+            pending, removed, cursor = dict(self._pending), set(self._removed), self._cursor
+        import faiss
+        with FileLock(self.lock_path):
+            meta = self._read_meta()
+            if cursor is not None:
+                meta['ingested_through'] = list(max(tuple(meta.get('ingested_through') or (0.0, '')), cursor))
+            if os.path.exists(self.index_path):
+                ids, vectors = self._export(faiss.read_index(self.index_path))
+            else:
+                ids, vectors = np.empty(0, dtype=np.int64), None
+            keep = ~np.isin(ids, list(removed | set(pending)))
+            ids = np.concatenate([ids[keep], np.array(list(pending), dtype=np.int64)])
+            new_vectors = np.stack(list(pending.values())) if pending else None
+            parts = [part for part in (vectors[keep] if vectors is not None else None, new_vectors) if part is not None]
+            vectors = np.concatenate(parts) if parts else np.empty((0, 0), dtype=np.float32)
+            index, meta = self._build(ids, vectors, meta)
+            tmp_path = f'{self.index_path}.{os.getpid()}.tmp'
+            faiss.write_index(index, tmp_path)
+            os.replace(tmp_path, self.index_path)
+            self._write_meta(meta)
+        with self._lock:
+            for job_id, vector in pending.items():
+                if self._pending.get(job_id) is vector:
+                    del self._pending[job_id]
+            self._removed -= removed
+            self._refresh()
+
+    def _build(self, ids, vectors, meta):
+        """Builds a flat index until there are enough vectors to train nlist IVF lists, then an IVF index.
+
+        The IVF centroids are reused until the corpus has doubled since they were trained.
+        Rebuilding from the exported vectors also compacts away removed entries.
+        """
+        import faiss
+        dim = vectors.shape[1] if len(vectors) else meta.get('dim', 1)
+        trained_on = meta.get('trained_on', 0)
+        if len(ids) < self.nlist * _MIN_POINTS_PER_LIST:
+            index = faiss.IndexIDMap2(faiss.IndexFlatIP(dim))
+            trained_on = 0
+        elif trained_on and len(ids) < 2 * trained_on and os.path.exists(self.centroids_path):
+            centroids = np.load(self.centroids_path)
+            quantizer = faiss.IndexFlatIP(dim)
+            quantizer.add(centroids)
+            index = faiss.IndexIVFFlat(quantizer, dim, len(centroids), faiss.METRIC_INNER_PRODUCT)
+        else:
+            quantizer = faiss.IndexFlatIP(dim)
+            index = faiss.IndexIVFFlat(quantizer, dim, self.nlist, faiss.METRIC_INNER_PRODUCT)
+            index.train(vectors)
+            trained_on = len(ids)
+            with open(self.centroids_path + '.tmp', 'wb') as f:
+                np.save(f, quantizer.reconstruct_n(0, quantizer.ntotal))
+            os.replace(self.centroids_path + '.tmp', self.centroids_path)
+        if len(ids):
+            index.add_with_ids(vectors, ids)
+        meta.update({'dim': int(dim), 'trained_on': int(trained_on), 'ntotal': int(len(ids))})
+        return index, meta
+
+    def _read_meta(self):
+        try:
+            with open(self.meta_path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write_meta(self, meta):
+        tmp_path = f'{self.meta_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def start_background_flush(self, interval=JOB_INDEX_FLUSH_INTERVAL):
+        """Flushes pending changes every `interval` seconds on a daemon thread."""
+        if self._flusher is not None or interval <= 0:
+            return
+
+        def flush_periodically():
+            while not self._stop.wait(interval):
+                try:
+                    self.flush()
+                except Exception as e:
+                    print(f"Job index flush failed: {str(e)}")
+
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=flush_periodically, daemon=True)
+        self._flusher.start()
+
+    def close(self):
+        """Stops the background flusher and writes any pending changes."""
+        if self._flusher is not None:
+            self._stop.set()
+            self._flusher = None
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            self._refresh()
+            return {
+                'model': self.model,
+                'on_disk': int(self._index.ntotal) if self._index is not None else 0,
+                'pending_adds': len(self._pending),
+                'pending_removes': len(self._removed),
+                'type': type(self._index).__name__ if self._index is not None else None,
+            }
@@ -0,0 +1,166 @@
+import os
+import threading
+import numpy as np
+from job_store import JobStore
+from rate_governor import RateGovernor, PRIORITY_BATCH
+
+
+# Stored postings embedded per batch when catching the job index up with the job store
+JOB_INDEX_INGEST_BATCH = int(os.getenv('JOB_INDEX_INGEST_BATCH', '256'))
+# OpenAI key the shared job index is embedded with. It belongs to the deployment, so no caller's
+# key pays for embedding every stored posting
+JOB_INDEX_OPENAI_API_KEY = os.getenv('JOB_INDEX_OPENAI_API_KEY') or os.getenv('OPENAI_API_KEY')
+
+
+class JobMatcher:
+    """Ranks job postings by cosine similarity to a resume with batched NumPy matrix products."""
+
+    _ingesting = set()
+    _ingest_requested = set()  # models whose running ingest should go round again when it finishes
+    _ingesting_lock = threading.Lock()
+
+    @staticmethod
+    def normalize(vectors):
+        """L2-normalizes each row so dot products become cosine similarities."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    @staticmethod
+    def resume_profile(chunk_vectors):
+        """Collapses a resume's chunk embeddings into one unit vector (the normalized centroid)."""
+        centroid = JobMatcher.normalize(chunk_vectors).mean(axis=0)
+        return JobMatcher.normalize(centroid)
+
+    @staticmethod
+    def rank(chunk_vectors, job_vectors, top_k):
+        """Returns (indices, scores) of the top_k jobs, best first."""
+        job_vectors = np.asarray(job_vectors, dtype=np.float32)
+        if len(job_vectors) == 0 or top_k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        scores = JobMatcher.normalize(job_vectors) @ JobMatcher.resume_profile(chunk_vectors)
+        top_k = min(top_k, len(scores))
+        # argpartition finds the top_k in linear time; only those few get sorted
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+        return top, scores[top]
+
+    @staticmethod
+    def job_text(job):
+        """Text embedded for a posting record (as returned by /linkedin-jobs)."""
+        return f"{job.get('Job Title', '')} at {job.get('Company Name', '')}\n{job.get('Job Description', '')}"
+
+    @staticmethod
+    def match(embeddings, chunks, jobs, top_k=10):
+        """Embeds resume chunks and postings with `embeddings` (a CachedEmbeddings) and returns the top_k
+        postings as records with an added 'Match Score'."""
+        chunk_vectors = embeddings.embed_array(chunks)
+        job_vectors = embeddings.embed_array([JobMatcher.job_text(job) for job in jobs])
+        indices, scores = JobMatcher.rank(chunk_vectors, job_vectors, top_k)
+        return [{**jobs[index], 'Match Score': float(score)} for index, score in zip(indices, scores)]
+
+    @staticmethod
+    def match_index(embeddings, index, store, chunks, top_k=10):
+        """Like match, but searches a JobVectorIndex of the job store's postings and loads only the top_k hits.
+
+        `embeddings` must use the index's model. Hits the job store no longer holds (expired
+        postings whose removal has not reached this index yet) are dropped from the index.
+        """
+        if top_k <= 0:
+            return []
+        profile = JobMatcher.resume_profile(embeddings.embed_array(chunks))
+        job_ids, scores = index.search(profile, top_k)
+        rows = store.get_many(job_ids)
+        gone = [job_id for job_id in job_ids if str(job_id) not in rows]
+        if gone:
+            index.remove(gone)
+        return [{**JobStore.to_record(rows[str(job_id)]), 'Match Score': score}
+                for job_id, score in zip(job_ids, scores) if str(job_id) in rows]
+
+    @staticmethod
+    def index_configured():
+        """True when the shared job index can be built: a local embedding backend, or a deployment OpenAI key."""
+        from embeddings import EMBEDDING_BACKEND
+        return EMBEDDING_BACKEND != 'openai' or bool(JOB_INDEX_OPENAI_API_KEY)
+
+    @staticmethod
+    def index_embeddings():
+        """Returns the embeddings the shared job index is built with, or None if it is not configured."""
+        from embeddings import CachedEmbeddings
+        if not JobMatcher.index_configured():
+            return None
+        return CachedEmbeddings.from_config(JOB_INDEX_OPENAI_API_KEY)
+
+    @staticmethod
+    def update_index(store=None):
+        """Brings the shared job index up to date with the job store on a background thread.
+
+        Expired postings are removed and newly described ones embedded with the deployment's
+        embedding config. Called after every scrape stores postings, and before /match searches.
+        Returns the index, or None if it is not configured.
+        """
+        from job_index import JobVectorIndex
+        embeddings = JobMatcher.index_embeddings()
+        if embeddings is None:
+            return None
+        index = JobVectorIndex.shared(embeddings.provider.model)
+        JobMatcher.ingest_in_background(embeddings, index, store or JobStore.shared())
+        return index
+
+    @staticmethod
+    def expire(index, store):
+        """Deletes postings older than the job store's max age from the store and the index.
+
+        Returns the number of postings removed.
+        """
+        job_ids = [job_id for job_id in store.expire() if str(job_id).isdigit()]
+        if job_ids:
+            index.remove(job_ids)
+        return len(job_ids)
+
+    @staticmethod
+    def ingest(embeddings, index, store, batch_size=JOB_INDEX_INGEST_BATCH):
+        """Embeds and adds the stored postings described after the index's ingest cursor, a batch at a time.
+
+        Returns the number of postings added.
+        """
+        added = 0
+        while True:
+            rows = store.described_since(index.ingest_cursor(), batch_size)
+            if not rows:
+                return added
+            rows_with_ids = [row for row in rows if str(row['job_id']).isdigit()]
+            if rows_with_ids:
+                vectors = embeddings.embed_array([JobMatcher.job_text(JobStore.to_record(row)) for row in rows_with_ids])
+            else:
+                vectors = np.empty((0, 1), dtype=np.float32)
+            index.add([row['job_id'] for row in rows_with_ids], vectors,
+                      cursor=(rows[-1]['described_at'], rows[-1]['job_id']))
+            added += len(rows_with_ids)
+
+    @staticmethod
+    def ingest_in_background(embeddings, index, store):
+        """Starts expiring stale postings and catching the index up with the job store on a daemon thread,
+        unless that is already running (it then goes round again, so postings stored meanwhile are not missed)."""
+        with JobMatcher._ingesting_lock:
+            if index.model in JobMatcher._ingesting:
+                JobMatcher._ingest_requested.add(index.model)
+                return
+            JobMatcher._ingesting.add(index.model)
+
+        def run():
+            # Embedding the backlog should not hold up interactive OpenAI calls
+            RateGovernor.set_priority(PRIORITY_BATCH)
+            while True:
+                try:
+                    JobMatcher.expire(index, store)
+                    JobMatcher.ingest(embeddings, index, store)
+                except Exception as e:
+                    print(f"Job index ingest failed: {str(e)}")
+                with JobMatcher._ingesting_lock:
+                    if index.model not in JobMatcher._ingest_requested:
+                        JobMatcher._ingesting.discard(index.model)
+                        return
+                    JobMatcher._ingest_requested.discard(index.model)
+
+        threading.Thread(target=run, daemon=True).start()
@@ -0,0 +1,166 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+
+JOB_STORE_PATH = os.getenv('JOB_STORE_PATH', '.job_store.sqlite3')
+JOB_STORE_MAX_AGE = float(os.getenv('JOB_STORE_MAX_AGE', str(7 * 24 * 3600)))
+
+# SQLite limits the number of bound parameters per statement
+_LOOKUP_BATCH = 500
+
+
+def _job_id(job_id):
+    """Returns job_id as a string, or None if it is missing (None, empty, or a NaN from pandas)."""
+    if isinstance(job_id, str):
+        return job_id or None
+    if isinstance(job_id, int) and not isinstance(job_id, bool):
+        return str(job_id)
+    return None
+
+
+class JobStore:
+    """SQLite store of scraped job postings keyed by LinkedIn job id."""
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path=JOB_STORE_PATH, max_age=JOB_STORE_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('''CREATE TABLE IF NOT EXISTS jobs (
+                                      job_id TEXT PRIMARY KEY,
+                                      company TEXT,
+                                      title TEXT,
+                                      location TEXT,
+                                      url TEXT,
+                                      description TEXT,
+                                      first_seen REAL NOT NULL,
+                                      last_seen REAL NOT NULL,
+                                      described_at REAL)''')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS jobs_last_seen ON jobs (last_seen)')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS jobs_described_at ON jobs (described_at, job_id)')
+            # Status of background scrapes, so any API process can answer a poll for a job another one queued
+            self._conn.execute('''CREATE TABLE IF NOT EXISTS scrape_jobs (
+                                      job_id TEXT PRIMARY KEY,
+                                      data TEXT NOT NULL,
+                                      finished_at REAL)''')
+
+    @classmethod
+    def shared(cls):
+        """Returns the process-wide store at JOB_STORE_PATH."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def get_many(self, job_ids):
+        """Returns {job_id: row dict} for the ids present in the store."""
+        job_ids = [job_id for job_id in map(_job_id, job_ids) if job_id]
+        found = {}
+        with self._lock:
+            for i in range(0, len(job_ids), _LOOKUP_BATCH):
+                batch = job_ids[i:i + _LOOKUP_BATCH]
+                placeholders = ','.join('?' * len(batch))
+                for row in self._conn.execute(f'SELECT * FROM jobs WHERE job_id IN ({placeholders})', batch):
+                    found[row['job_id']] = dict(row)
+        return found
+
+    def described_since(self, cursor=None, limit=256):
+        """Returns up to `limit` postings with a description, ordered by (described_at, job_id), that come
+        after `cursor` (a (described_at, job_id) pair; None starts from the beginning)."""
+        described_at, job_id = cursor or (0.0, '')
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(
+                '''SELECT * FROM jobs
+                   WHERE description IS NOT NULL AND (described_at > ? OR (described_at = ? AND job_id > ?))
+                   ORDER BY described_at, job_id LIMIT ?''', (described_at, described_at, job_id, limit))]
+
+    @staticmethod
+    def to_record(row):
+        """Converts a stored row to the /linkedin-jobs record format."""
+        return {
+            'Company Name': row['company'],
+            'Job Title': row['title'],
+            'Location': row['location'],
+            'Website URL': row['url'],
+            'Job ID': row['job_id'],
+            'Job Description': row['description'],
+        }
+
+    def fresh_descriptions(self, job_ids, max_age=None):
+        """Returns {job_id: description} for stored descriptions fetched within max_age seconds."""
+        max_age = self.max_age if max_age is None else max_age
+        cutoff = time.time() - max_age
+        return {job_id: row['description'] for job_id, row in self.get_many(job_ids).items()
+                if row['description'] and row['described_at'] is not None and row['described_at'] >= cutoff}
+
+    def upsert_many(self, jobs):
+        """Inserts or updates postings in one transaction.
+
+        Each job is a dict with job_id and any of company, title, location, url and
+        description. first_seen is kept from the first insert; a stored description is
+        only replaced when a new non-empty one is given.
+        """
+        now = time.time()
+        rows = [(_job_id(job.get('job_id')), job.get('company'), job.get('title'), job.get('location'),
+                 job.get('url'), job.get('description') or None, now, now, now if job.get('description') else None)
+                for job in jobs if _job_id(job.get('job_id'))]
+        with self._lock, self._conn:
+            self._conn.executemany('''INSERT INTO jobs (job_id, company, title, location, url, description,
+                                                        first_seen, last_seen, described_at)
+                                      VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                                      ON CONFLICT (job_id) DO UPDATE SET
+                                          company = COALESCE(excluded.company, company),
+                                          title = COALESCE(excluded.title, title),
+                                          location = COALESCE(excluded.location, location),
+                                          url = COALESCE(excluded.url, url),
+                                          description = COALESCE(excluded.description, description),
+                                          described_at = COALESCE(excluded.described_at, described_at),
+                                          last_seen = excluded.last_seen''', rows)
+        return len(rows)
+
+    def save_scrape_job(self, job_id, data, finished_at=None):
+        """Stores (or replaces) the JSON-ready status of a background scrape."""
+        with self._lock, self._conn:
+            self._conn.execute('INSERT OR REPLACE INTO scrape_jobs (job_id, data, finished_at) VALUES (?, ?, ?)',
+                               (job_id, json.dumps(data), finished_at))
+
+    def scrape_job(self, job_id):
+        """Returns the stored status of a background scrape, or None."""
+        with self._lock:
+            row = self._conn.execute('SELECT data FROM scrape_jobs WHERE job_id = ?', (job_id,)).fetchone()
+        return json.loads(row['data']) if row else None
+
+    def forget_scrape_jobs(self, finished_before):
+        """Deletes background scrapes that finished before the given time."""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM scrape_jobs WHERE finished_at < ?', (finished_before,))
+
+    def expire(self, max_age=None):
+        """Deletes postings not seen in a scrape for max_age seconds and returns their job ids."""
+        cutoff = time.time() - (self.max_age if max_age is None else max_age)
+        with self._lock, self._conn:
+            job_ids = [row['job_id'] for row in self._conn.execute('SELECT job_id FROM jobs WHERE last_seen < ?',
+                                                                   (cutoff,))]
+            self._conn.execute('DELETE FROM jobs WHERE last_seen < ?', (cutoff,))
+        return job_ids
+
+    def all_jobs(self, with_description=True):
+        """Returns every stored posting, most recently seen first."""
+        query = 'SELECT * FROM jobs'
+        if with_description:
+            query += ' WHERE description IS NOT NULL'
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(query + ' ORDER BY last_seen DESC')]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
@@ -1,14 +1,278 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse
-from typing import List
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
+from fastapi.responses import StreamingResponse, Response
+from starlette.routing import Match
+from typing import List, Optional
+import io
+import os
+import json
+import zipfile
+import asyncio
+import time
+import hashlib
+import functools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 import uvicorn
-import pandas as pd
 
 # Import the ResumeAnalyzer and LinkedinScraper classes from core_functions.py
-from core_functions import ResumeAnalyzer, LinkedinScraper
+from core_functions import ResumeAnalyzer, ResumeSession, LinkedinScraper
+from http_scraper import LinkedinHttpScraper
+from job_matching import JobMatcher
+from embeddings import EmbeddingCache
+from job_store import JobStore
+from pdf_extract import PdfTextExtractor
+from job_index import JobVectorIndex
+from scrape_queue import ScrapeQueue
+from single_flight import SingleFlight
+from rate_governor import RateGovernor, PRIORITY_BATCH
+from metrics import Metrics, CONTENT_TYPE, HTTP_REQUEST_SECONDS, HTTP_REQUESTS_IN_FLIGHT
 
 app = FastAPI()
 
+# Default scraping backend for /linkedin-jobs: "selenium" (headless Chrome) or "http" (guest HTML over HTTP)
+SCRAPER_BACKEND = os.getenv('SCRAPER_BACKEND', 'selenium')
+http_scraper = LinkedinHttpScraper()
+# Background scrapes submitted through /linkedin-jobs/jobs run on worker processes
+scrape_queue = ScrapeQueue()
+
+# Subsystems whose heavy imports (LangChain/OpenAI for "resume", Selenium/pandas for "scraper")
+# load at startup instead of on the first request that needs them, e.g. WARM_UP=resume,scraper
+WARM_UP = [name.strip() for name in os.getenv('WARM_UP', '').split(',') if name.strip()]
+
+# Maximum number of LLM prompts a single /resume-analysis request runs at once
+ANALYSIS_CONCURRENCY = int(os.getenv('ANALYSIS_CONCURRENCY', '4'))
+
+# Prompts in flight across every /resume-analysis/batch request, and resumes accepted per batch
+BATCH_LLM_CONCURRENCY = int(os.getenv('BATCH_LLM_CONCURRENCY', '8'))
+BATCH_MAX_RESUMES = int(os.getenv('BATCH_MAX_RESUMES', '500'))
+# Most PDF bytes one batch may hold once its archive is decompressed
+BATCH_MAX_BYTES = int(os.getenv('BATCH_MAX_BYTES', str(200 * 1024 * 1024)))
+batch_llm_semaphore = asyncio.Semaphore(max(1, BATCH_LLM_CONCURRENCY))
+
+# Identical /job-recommendations and /resume-analysis requests in flight at the same time
+# (double submits, client retries) share one computation
+analysis_flights = SingleFlight("resume_analysis")
+
+# Blocking work runs on one bounded pool per stage type, so a slow scrape
+# cannot starve resume analysis and none of them block the event loop
+STAGE_POOL_SIZES = {
+    "pdf": int(os.getenv('PDF_POOL_SIZE', '2')),
+    "llm": int(os.getenv('LLM_POOL_SIZE', '16')),
+    "browser": int(os.getenv('BROWSER_POOL_SIZE', '2')),
+}
+stage_pools = {
+    stage: ThreadPoolExecutor(max_workers=size, thread_name_prefix=f"{stage}-stage")
+    for stage, size in STAGE_POOL_SIZES.items()
+}
+
+
+async def run_in_stage(stage, func, *args, **kwargs):
+    """Runs a blocking call on the executor for its stage ('pdf', 'llm' or 'browser') and awaits the result."""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(stage_pools[stage], functools.partial(context.run, func, *args, **kwargs))
+
+
+def route_path(scope):
+    """Returns the path template of the route a request matches (e.g. /linkedin-jobs/jobs/{job_id}), so metric
+    labels do not grow with every id."""
+    for route in app.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Records each request's latency (until the response starts) and the number of requests in flight."""
+    route = route_path(request.scope)
+    status = 500
+    start = time.perf_counter()
+    HTTP_REQUESTS_IN_FLIGHT.inc(route=route)
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_REQUESTS_IN_FLIGHT.dec(route=route)
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, method=request.method, route=route, status=status)
+
+
+@Metrics.register_collector
+def component_metrics():
+    """Occupancy of the driver pool, scrape queue, stage executors and caches, read when /metrics is scraped."""
+    pool = LinkedinScraper.driver_pool().stats()
+    queue_stats = scrape_queue.stats()
+    families = [
+        ("driver_pool_drivers", "gauge", "Chrome drivers in the pool by state.",
+         [({"state": state}, pool[state]) for state in ("idle", "leased")]),
+        ("scrape_queue_jobs", "gauge", "Background scrapes queued or running.",
+         [({"status": status}, queue_stats[status]) for status in ("queued", "running")]),
+        ("scrape_queue_finished_total", "counter", "Background scrapes finished, by outcome.",
+         [({"status": status}, queue_stats[status]) for status in ("done", "failed")]),
+        ("stage_pool_queued", "gauge", "Calls waiting for a free thread in each stage executor.",
+         [({"stage": stage}, pool_executor._work_queue.qsize()) for stage, pool_executor in stage_pools.items()]),
+        ("single_flight_in_flight", "gauge", "Distinct resume analyses in flight that identical requests can join.",
+         [({"name": analysis_flights.name}, len(analysis_flights))]),
+        ("pdf_chunk_cache_entries", "gauge", "Resumes whose chunks are cached in memory.",
+         [({}, len(ResumeAnalyzer._chunk_cache))]),
+        ("embedding_cache_entries", "gauge", "Vectors in the embedding cache, by model.",
+         [({"model": cache["model"]}, cache["entries"]) for cache in ResumeAnalyzer.embedding_cache_stats()]),
+    ]
+    # Summed over every API key's governor, so label values do not grow with the number of keys
+    governors = {kind: {"accounts": 0, "concurrency_limit": 0, "in_flight": 0, "waiting": {}, "backing_off": 0}
+                 for kind in ("chat", "embeddings")}
+    for stats in (governor.stats() for governor in RateGovernor.governors()):
+        totals = governors[stats["kind"]]
+        totals["accounts"] += 1
+        totals["concurrency_limit"] += stats["concurrency_limit"]
+        totals["in_flight"] += stats["in_flight"]
+        totals["backing_off"] += stats["paused_seconds"] > 0
+        for priority, count in stats["waiting"].items():
+            totals["waiting"][priority] = totals["waiting"].get(priority, 0) + count
+    families += [
+        ("openai_accounts", "gauge", "API keys with their own OpenAI rate governor.",
+         [({"kind": kind}, totals["accounts"]) for kind, totals in governors.items()]),
+        ("openai_concurrency_limit", "gauge", "Adaptive limits on OpenAI calls in flight, summed over API keys.",
+         [({"kind": kind}, totals["concurrency_limit"]) for kind, totals in governors.items()]),
+        ("openai_in_flight", "gauge", "OpenAI calls in flight.",
+         [({"kind": kind}, totals["in_flight"]) for kind, totals in governors.items()]),
+        ("openai_waiting", "gauge", "OpenAI calls waiting for the rate governor, by priority.",
+         [({"kind": kind, "priority": priority}, count)
+          for kind, totals in governors.items() for priority, count in totals["waiting"].items()]),
+        ("openai_backing_off", "gauge", "API keys whose calls are paused by a rate limit backoff.",
+         [({"kind": kind}, totals["backing_off"]) for kind, totals in governors.items()]),
+    ]
+    response_cache = ResumeAnalyzer.response_cache_stats()
+    if response_cache is not None:
+        families.append(("llm_response_cache_entries", "gauge", "Responses in the LLM response cache.",
+                         [({}, response_cache["entries"])]))
+    return families
+
+
+def match_resume(openai_api_key, chunks, postings, top_k):
+    """Ranks the given postings, or when postings is None the job store's (through the persistent job index)."""
+    embeddings = ResumeAnalyzer.embeddings(openai_api_key)
+    if postings is not None:
+        return JobMatcher.match(embeddings, chunks, postings, top_k)
+    index = JobMatcher.update_index()
+    if index is None:
+        raise Exception("Matching stored postings needs JOB_INDEX_OPENAI_API_KEY on the server.")
+    return JobMatcher.match_index(embeddings, index, JobStore.shared(), chunks, top_k)
+
+
+async def iterate_in_stage(stage, iterator):
+    """Drains a blocking iterator on a stage executor, yielding its items to async code."""
+    done = object()
+    while True:
+        item = await run_in_stage(stage, next, iterator, done)
+        if item is done:
+            return
+        yield item
+
+
+def format_stream_event(stream_format, event, data):
+    """Encodes one streaming event as a server-sent event or as a line of NDJSON."""
+    if stream_format == "ndjson":
+        return json.dumps({"event": event, **data}) + "\n"
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.on_event("startup")
+async def warm_up_imports():
+    """Imports the dependencies of the subsystems listed in WARM_UP before the API starts serving."""
+    if "resume" in WARM_UP:
+        await run_in_stage("llm", ResumeAnalyzer.preload)
+    if "scraper" in WARM_UP:
+        await run_in_stage("browser", LinkedinScraper.preload)
+
+
+@app.on_event("startup")
+async def warm_driver_pool():
+    """Starts the minimum number of Chrome drivers so the first scrape does not pay browser startup."""
+    try:
+        await run_in_stage("browser", LinkedinScraper.driver_pool().warm)
+    except Exception as e:
+        # The API still serves resume analysis without a browser; scrapes will retry startup
+        print(f"Chrome driver pool warm-up failed: {str(e)}")
+
+
+@app.on_event("shutdown")
+def shutdown_stage_pools():
+    """Stops the stage executors and PDF extraction workers, dropping work that has not started, and quits pooled drivers."""
+    for pool in stage_pools.values():
+        pool.shutdown(wait=False, cancel_futures=True)
+    LinkedinScraper.driver_pool().close()
+    PdfTextExtractor.shutdown()
+
+
+@app.on_event("shutdown")
+def shutdown_scrape_queue():
+    """Drops queued scrapes and waits for running ones before stopping the worker processes."""
+    scrape_queue.shutdown()
+
+
+@app.on_event("shutdown")
+def flush_job_indexes():
+    """Writes pending job index changes to disk before the worker exits."""
+    for index in list(JobVectorIndex._instances.values()):
+        index.close()
+
+
+@app.on_event("shutdown")
+def flush_embedding_caches():
+    """Writes which embedding cache entries were recently used, so eviction order survives a restart."""
+    for cache in list(EmbeddingCache._instances.values()):
+        cache.flush()
+
+
+@app.on_event("shutdown")
+async def close_http_scraper():
+    """Closes the HTTP scraper's pooled connections."""
+    await http_scraper.aclose()
+
+
+def build_user_details(name, age, gender, experience, job_type, location, skills):
+    """Builds the user details dictionary expected by ResumeAnalyzer.job_recommendation_prompt."""
+    return {
+        "name": name,
+        "age": age,
+        "gender": gender,
+        "experience": experience,
+        "job_type": [j.strip() for j in job_type.split(",") if j.strip()],
+        "location": location,
+        "skills": skills
+    }
+
+
+def analysis_key(kind, resume_bytes, openai_api_key, user_details, use_cache):
+    """Identifies an analysis request by its kind, resume content, user details and options.
+
+    The API key is part of the key (hashed), so a request with a bad key never shares another's result or error.
+    """
+    payload = json.dumps([
+        kind,
+        hashlib.sha256(resume_bytes).hexdigest(),
+        hashlib.sha256(openai_api_key.encode("utf-8")).hexdigest(),
+        user_details,
+        use_cache,
+    ], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def run_analyses(session, prompts, concurrency=ANALYSIS_CONCURRENCY, semaphore=None):
+    """Runs a dict of named prompts against one ResumeSession concurrently, at most `concurrency` at a time
+    (or as many as a shared `semaphore` allows)."""
+    semaphore = semaphore or asyncio.Semaphore(max(1, concurrency))
+
+    async def run(prompt):
+        async with semaphore:
+            return await run_in_stage("llm", session.analyze, prompt)
+
+    results = await asyncio.gather(*(run(prompt) for prompt in prompts.values()))
+    return dict(zip(prompts, results))
+
 
 @app.post("/job-recommendations")
 async def job_recommendations(
@@ -20,38 +284,298 @@ async def job_recommendations(
     location: str = Form(...),
     skills: str = Form(...),
     openai_api_key: str = Form(...),
-    resume: UploadFile = File(...)
+    resume: UploadFile = File(...),
+    use_cache: bool = Form(True)  # False forces fresh LLM responses
 ):
     """
     Endpoint to get job recommendations based on resume and user details.
     Expects user details and a resume PDF. Returns the resume summary and job recommendations generated by OpenAI.
+    Identical requests that arrive while one is still running wait for its result instead of running again.
     """
     if resume.content_type != "application/pdf":
         raise HTTPException(status_code=400, detail="Resume must be a PDF file.")
     try:
-        # Process the resume into text chunks using the provided pdf file
-        chunks = ResumeAnalyzer.pdf_to_chunks(resume.file)
-        
-        # Generate resume summary prompt and summary
-        summary_prompt_text = ResumeAnalyzer.summary_prompt(query_with_chunks=chunks)
-        summary = ResumeAnalyzer.openai(openai_api_key, chunks, analyze=summary_prompt_text)
-        
+        resume_bytes = await resume.read()
         # Build user details dictionary as required by the recommendation prompt
-        user_details = {
-            "name": name,
-            "age": age,
-            "gender": gender,
-            "experience": experience,
-            "job_type": [j.strip() for j in job_type.split(",") if j.strip()],
-            "location": location,
-            "skills": skills
-        }
-        
-        # Generate job recommendation prompt and recommendations
-        job_rec_prompt = ResumeAnalyzer.job_recommendation_prompt(user_details, summary)
-        recommendations = ResumeAnalyzer.openai(openai_api_key, chunks, analyze=job_rec_prompt)
-        
-        return {"resume_summary": summary, "job_recommendations": recommendations}
+        user_details = build_user_details(name, age, gender, experience, job_type, location, skills)
+        key = analysis_key("job_recommendations", resume_bytes, openai_api_key, user_details, use_cache)
+        return await analysis_flights.run(key, recommend_jobs, resume_bytes, openai_api_key, user_details, use_cache)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def recommend_jobs(resume_bytes, openai_api_key, user_details, use_cache):
+    """Summarizes the resume, then recommends jobs from the summary and the user details."""
+    # Process the resume into text chunks using the provided pdf file
+    chunks = await run_in_stage("pdf", ResumeAnalyzer.pdf_to_chunks, resume_bytes)
+
+    # Embed the chunks once; both prompts below reuse the same index
+    session = await run_in_stage("llm", ResumeSession, openai_api_key, chunks, use_cache)
+
+    # Generate resume summary prompt and summary
+    summary_prompt_text = ResumeAnalyzer.summary_prompt(query_with_chunks=chunks)
+    summary = await run_in_stage("llm", session.analyze, summary_prompt_text)
+
+    # Generate job recommendation prompt and recommendations
+    job_rec_prompt = ResumeAnalyzer.job_recommendation_prompt(user_details, summary)
+    recommendations = await run_in_stage("llm", session.analyze, job_rec_prompt)
+
+    return {"resume_summary": summary, "job_recommendations": recommendations}
+
+
+@app.post("/job-recommendations/stream")
+async def job_recommendations_stream(
+    name: str = Form(...),
+    age: int = Form(...),
+    gender: str = Form(...),
+    experience: int = Form(...),
+    job_type: str = Form(...),  # Comma separated string
+    location: str = Form(...),
+    skills: str = Form(...),
+    openai_api_key: str = Form(...),
+    resume: UploadFile = File(...),
+    use_cache: bool = Form(True),  # False forces fresh LLM responses
+    stream_format: str = Form("sse")  # "sse" or "ndjson"
+):
+    """
+    Streaming variant of /job-recommendations.
+    Streams the resume summary tokens as they are generated, then the job recommendation tokens,
+    as server-sent events (default) or newline-delimited JSON.
+    """
+    if resume.content_type != "application/pdf":
+        raise HTTPException(status_code=400, detail="Resume must be a PDF file.")
+    if stream_format not in ("sse", "ndjson"):
+        raise HTTPException(status_code=400, detail="stream_format must be 'sse' or 'ndjson'.")
+    try:
+        chunks = await run_in_stage("pdf", ResumeAnalyzer.pdf_to_chunks, resume.file)
+        session = await run_in_stage("llm", ResumeSession, openai_api_key, chunks, use_cache)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    user_details = build_user_details(name, age, gender, experience, job_type, location, skills)
+
+    async def events():
+        try:
+            summary = ""
+            summary_prompt_text = ResumeAnalyzer.summary_prompt(query_with_chunks=chunks)
+            async for token in iterate_in_stage("llm", session.stream(summary_prompt_text)):
+                summary += token
+                yield format_stream_event(stream_format, "resume_summary", {"token": token})
+
+            job_rec_prompt = ResumeAnalyzer.job_recommendation_prompt(user_details, summary)
+            async for token in iterate_in_stage("llm", session.stream(job_rec_prompt)):
+                yield format_stream_event(stream_format, "job_recommendations", {"token": token})
+            yield format_stream_event(stream_format, "done", {})
+        except Exception as e:
+            # Headers are already sent, so errors are reported in-band
+            yield format_stream_event(stream_format, "error", {"detail": str(e)})
+
+    media_type = "application/x-ndjson" if stream_format == "ndjson" else "text/event-stream"
+    return StreamingResponse(events(), media_type=media_type)
+
+
+@app.post("/resume-analysis")
+async def resume_analysis(
+    name: str = Form(...),
+    age: int = Form(...),
+    gender: str = Form(...),
+    experience: int = Form(...),
+    job_type: str = Form(...),  # Comma separated string
+    location: str = Form(...),
+    skills: str = Form(...),
+    openai_api_key: str = Form(...),
+    resume: UploadFile = File(...),
+    use_cache: bool = Form(True)  # False forces fresh LLM responses
+):
+    """
+    Endpoint to get the full resume report in one request.
+    Computes the resume summary once, then runs the strength, weakness, job title and
+    job recommendation prompts concurrently against the same resume index.
+    Identical requests that arrive while one is still running wait for its result instead of running again.
+    """
+    if resume.content_type != "application/pdf":
+        raise HTTPException(status_code=400, detail="Resume must be a PDF file.")
+    try:
+        resume_bytes = await resume.read()
+        user_details = build_user_details(name, age, gender, experience, job_type, location, skills)
+        key = analysis_key("resume_analysis", resume_bytes, openai_api_key, user_details, use_cache)
+        return await analysis_flights.run(key, analyze_resume, resume_bytes, openai_api_key, user_details, use_cache)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def analyze_resume(resume_bytes, openai_api_key, user_details, use_cache):
+    """Builds the full /resume-analysis report: the summary, then the follow-up prompts concurrently."""
+    chunks = await run_in_stage("pdf", ResumeAnalyzer.pdf_to_chunks, resume_bytes)
+    session = await run_in_stage("llm", ResumeSession, openai_api_key, chunks, use_cache)
+
+    # Every other prompt builds on the summary, so it has to finish first
+    summary_prompt_text = ResumeAnalyzer.summary_prompt(query_with_chunks=chunks)
+    summary = await run_in_stage("llm", session.analyze, summary_prompt_text)
+
+    results = await run_analyses(session, {
+        "strengths": ResumeAnalyzer.strength_prompt(query_with_chunks=summary),
+        "weaknesses": ResumeAnalyzer.weakness_prompt(query_with_chunks=summary),
+        "job_titles": ResumeAnalyzer.job_title_prompt(query_with_chunks=summary),
+        "job_recommendations": ResumeAnalyzer.job_recommendation_prompt(user_details, summary),
+    })
+    return {"resume_summary": summary, **results}
+
+
+def read_batch_resumes(resumes, archive_bytes, max_resumes=BATCH_MAX_RESUMES, max_bytes=BATCH_MAX_BYTES):
+    """Returns [(filename, pdf bytes)] from uploaded PDFs and the PDFs inside an optional zip archive.
+
+    Raises ValueError if there are more than max_resumes PDFs or more than max_bytes of them. The
+    archive is checked from its directory before anything is decompressed; reads never go past the
+    sizes the directory declares.
+    """
+    files = list(resumes)
+    total_bytes = sum(len(data) for _, data in files)
+    if archive_bytes:
+        with zipfile.ZipFile(io.BytesIO(archive_bytes)) as archive:
+            entries = [info for info in archive.infolist()
+                       if not info.is_dir() and info.filename.lower().endswith(".pdf")
+                       and not info.filename.startswith("__MACOSX/")]
+            if len(files) + len(entries) > max_resumes:
+                raise ValueError(f"At most {max_resumes} resumes per batch.")
+            total_bytes += sum(info.file_size for info in entries)
+            if total_bytes > max_bytes:
+                raise ValueError(f"At most {max_bytes} bytes of PDFs per batch.")
+            for info in entries:
+                files.append((info.filename, archive.read(info)))
+    if len(files) > max_resumes:
+        raise ValueError(f"At most {max_resumes} resumes per batch.")
+    if total_bytes > max_bytes:
+        raise ValueError(f"At most {max_bytes} bytes of PDFs per batch.")
+    return files
+
+
+async def analyze_batch_resume(filename, session, chunks, details):
+    """Runs the summary and its follow-up prompts for one resume of a batch under the global batch limit.
+
+    Returns a ("resume", report) or ("error", detail) stream event.
+    """
+    try:
+        report = await analyze_batch_report(session, chunks, build_user_details(**details) if details else None)
+        return "resume", {"filename": filename, **report}
+    except Exception as e:
+        return "error", {"filename": filename, "detail": str(e)}
+
+
+async def analyze_batch_report(session, chunks, user_details):
+    async with batch_llm_semaphore:
+        summary_prompt_text = ResumeAnalyzer.summary_prompt(query_with_chunks=chunks)
+        summary = await run_in_stage("llm", session.analyze, summary_prompt_text)
+    prompts = {
+        "strengths": ResumeAnalyzer.strength_prompt(query_with_chunks=summary),
+        "weaknesses": ResumeAnalyzer.weakness_prompt(query_with_chunks=summary),
+        "job_titles": ResumeAnalyzer.job_title_prompt(query_with_chunks=summary),
+    }
+    if user_details:
+        prompts["job_recommendations"] = ResumeAnalyzer.job_recommendation_prompt(user_details, summary)
+    results = await run_analyses(session, prompts, semaphore=batch_llm_semaphore)
+    return {"resume_summary": summary, **results}
+
+
+@app.post("/resume-analysis/batch")
+async def resume_analysis_batch(
+    openai_api_key: str = Form(...),
+    resumes: List[UploadFile] = File([]),
+    archive: Optional[UploadFile] = File(None),  # zip of PDFs
+    user_details: Optional[str] = Form(None),  # JSON object: filename -> details for job recommendations
+    use_cache: bool = Form(True),  # False forces fresh LLM responses
+    stream_format: str = Form("ndjson")  # "ndjson" or "sse"
+):
+    """
+    Endpoint to analyze many resumes in one request.
+    Accepts PDFs as repeated `resumes` files and/or a zip `archive`. Extracts them in parallel,
+    embeds every resume's chunks in shared batches, and streams each resume's report (summary,
+    strengths, weaknesses, job titles, and job recommendations for resumes with user details)
+    as soon as it completes.
+    """
+    if stream_format not in ("sse", "ndjson"):
+        raise HTTPException(status_code=400, detail="stream_format must be 'sse' or 'ndjson'.")
+    try:
+        details = json.loads(user_details) if user_details else {}
+    except ValueError:
+        raise HTTPException(status_code=400, detail="user_details must be a JSON object keyed by filename.")
+    try:
+        uploads = [(resume.filename, await resume.read()) for resume in resumes]
+        # Decompressing is CPU work, so it runs off the event loop
+        files = await run_in_stage("pdf", read_batch_resumes, uploads, await archive.read() if archive else None)
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail="archive must be a zip file.")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not files:
+        raise HTTPException(status_code=400, detail="No PDF resumes were uploaded.")
+
+    async def events():
+        # Batch prompts and embeddings yield to interactive requests at the OpenAI rate governor
+        RateGovernor.set_priority(PRIORITY_BATCH)
+        tasks = []
+        try:
+            chunk_lists = await run_in_stage("pdf", ResumeAnalyzer.pdfs_to_chunks, [data for _, data in files])
+            parsed = []
+            for (filename, _), chunks in zip(files, chunk_lists):
+                if isinstance(chunks, Exception) or not chunks:
+                    detail = str(chunks) if isinstance(chunks, Exception) else "No text found in PDF."
+                    yield format_stream_event(stream_format, "error", {"filename": filename, "detail": detail})
+                else:
+                    parsed.append((filename, chunks))
+
+            sessions = await run_in_stage("llm", ResumeSession.from_batch, openai_api_key,
+                                          [chunks for _, chunks in parsed], use_cache)
+            tasks = [asyncio.ensure_future(analyze_batch_resume(filename, session, chunks, details.get(filename)))
+                     for (filename, chunks), session in zip(parsed, sessions)]
+            failed = len(files) - len(parsed)
+            for next_done in asyncio.as_completed(tasks):
+                event, data = await next_done
+                failed += event == "error"
+                yield format_stream_event(stream_format, event, data)
+            yield format_stream_event(stream_format, "done", {"resumes": len(files), "failed": failed})
+        except Exception as e:
+            # Headers are already sent, so errors are reported in-band
+            yield format_stream_event(stream_format, "error", {"detail": str(e)})
+        finally:
+            # Stop the remaining prompts if the client went away
+            for task in tasks:
+                task.cancel()
+
+    media_type = "application/x-ndjson" if stream_format == "ndjson" else "text/event-stream"
+    return StreamingResponse(events(), media_type=media_type)
+
+
+@app.post("/match")
+async def match_jobs(
+    openai_api_key: str = Form(...),
+    resume: UploadFile = File(...),
+    top_k: int = Form(10),
+    jobs: Optional[str] = Form(None)  # JSON list of postings as returned by /linkedin-jobs
+):
+    """
+    Endpoint to rank job postings by semantic similarity to a resume.
+    Ranks the given postings, or every posting in the job store when none are given
+    (searched through the persistent job index), and returns the top_k with their
+    cosine similarity scores.
+    The index is kept up to date as scrapes store postings, using the server's embedding
+    configuration (JOB_INDEX_OPENAI_API_KEY), not the caller's key.
+    """
+    if resume.content_type != "application/pdf":
+        raise HTTPException(status_code=400, detail="Resume must be a PDF file.")
+    if top_k < 1:
+        raise HTTPException(status_code=400, detail="top_k must be at least 1.")
+    try:
+        postings = json.loads(jobs) if jobs else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="jobs must be a JSON list of job postings.")
+    if postings is None and not JobMatcher.index_configured():
+        raise HTTPException(status_code=503,
+                            detail="Matching stored postings needs JOB_INDEX_OPENAI_API_KEY on the server; send jobs instead.")
+    try:
+        chunks = await run_in_stage("pdf", ResumeAnalyzer.pdf_to_chunks, resume.file)
+        matches = await run_in_stage("llm", match_resume, openai_api_key, chunks, postings, top_k)
+        return {"matches": matches}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -60,32 +584,26 @@ async def job_recommendations(
 async def linkedin_jobs(
     job_titles: str = Form(...),  # Comma separated job titles
     job_location: str = Form(...),
-    job_count: int = Form(...)
+    job_count: int = Form(...),
+    backend: str = Form(SCRAPER_BACKEND)  # "selenium" or "http"
 ):
     """
     Endpoint to scrape LinkedIn jobs based on job title(s), location, and number of jobs to fetch.
-    Returns a list of job postings with company name, job title, location, website URL, and job description.
+    Returns a list of job postings with company name, job title, location, website URL, job id, and job description.
     """
+    if backend not in ("selenium", "http"):
+        raise HTTPException(status_code=400, detail="backend must be 'selenium' or 'http'.")
     try:
         # Convert job_titles string to list
         job_titles_list = [job.strip() for job in job_titles.split(",") if job.strip()]
         
-        # Initialize Selenium webdriver
-        driver = LinkedinScraper.webdriver_setup()
-        
-        # Build the LinkedIn jobs URL
-        link = LinkedinScraper.build_url(job_titles_list, job_location)
-        
-        # Open the link and scroll down to load jobs
-        LinkedinScraper.link_open_scrolldown(driver, link, job_count)
-        
-        # Scrape company data from the page
-        df = LinkedinScraper.scrap_company_data(driver, job_titles_list, job_location)
-        
-        # Scrape job descriptions from individual job pages
-        df_final = LinkedinScraper.scrap_job_description(driver, df, job_count)
-        
-        driver.quit()
+        if backend == "http":
+            # Plain HTTP scraping is async and needs no browser
+            df_final = await http_scraper.aget_linkedin_jobs(job_titles_list, job_location, job_count)
+        else:
+            # Run the whole Selenium session on the browser pool with a pooled driver
+            df_final = await run_in_stage("browser", LinkedinScraper.get_linkedin_jobs,
+                                          job_titles_list, job_location, job_count)
         
         # Convert the DataFrame to a list of dictionaries to return as JSON
         jobs = df_final.to_dict(orient="records")
@@ -94,5 +612,54 @@ async def linkedin_jobs(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/linkedin-jobs/jobs", status_code=202)
+async def submit_linkedin_jobs(
+    job_titles: str = Form(...),  # Comma separated job titles
+    job_location: str = Form(...),
+    job_count: int = Form(...),
+    backend: str = Form(SCRAPER_BACKEND)  # "selenium" or "http"
+):
+    """
+    Endpoint to queue a LinkedIn scrape and return at once.
+    Returns the scrape job's id and status; poll /linkedin-jobs/jobs/{job_id} for the result.
+    An identical scrape that is still queued or running is returned instead of a new one.
+    """
+    if backend not in ("selenium", "http"):
+        raise HTTPException(status_code=400, detail="backend must be 'selenium' or 'http'.")
+    job_titles_list = [job.strip() for job in job_titles.split(",") if job.strip()]
+    # submit writes the job's status to SQLite, so it runs off the event loop
+    job = await asyncio.to_thread(scrape_queue.submit, backend, job_titles_list, job_location, job_count)
+    return {"job_id": job.id, "status": job.status}
+
+
+@app.get("/linkedin-jobs/jobs/{job_id}")
+async def linkedin_jobs_status(job_id: str):
+    """
+    Endpoint to poll a queued scrape.
+    Returns its status (queued, running, done or failed), and the postings once it is done.
+    """
+    job = await asyncio.to_thread(scrape_queue.status, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired scrape job.")
+    return job
+
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Endpoint for Prometheus: per-stage latency histograms, retry and cache hit counters, in-flight gauges
+    and pool/queue occupancy, in the Prometheus text format.
+    """
+    return Response(Metrics.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/linkedin-jobs/queue")
+async def linkedin_jobs_queue():
+    """
+    Endpoint to inspect the scrape queue: queued and running scrapes and finished counts.
+    """
+    return scrape_queue.stats()
+
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8001) 
\ No newline at end of file
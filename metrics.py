@@ -0,0 +1,222 @@
+"""Process-wide latency histograms, counters and gauges, rendered in the Prometheus text format.
+
+Recording a sample is a dict lookup and a few additions under a lock, so stages on the
+hot path can be timed. Values other components already track (pool occupancy, queue
+depth, cache sizes) are read by collectors when /metrics is scraped.
+"""
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+
+METRICS_NAMESPACE = 'jobrec'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Upper bounds (seconds) of the latency buckets, from an in-memory cache hit to a long scrape
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metrics:
+    """Registry of every metric and collector in this process."""
+
+    _metrics = []
+    _collectors = []
+
+    @staticmethod
+    def register(metric):
+        Metrics._metrics.append(metric)
+        return metric
+
+    @staticmethod
+    def register_collector(collector):
+        """Adds a function called on every scrape that returns [(name, type, help, [(labels, value)])]."""
+        Metrics._collectors.append(collector)
+        return collector
+
+    @staticmethod
+    def render():
+        """Returns every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in Metrics._metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        for collector in Metrics._collectors:
+            try:
+                families = collector()
+            except Exception as e:
+                # One failing collector should not take the whole endpoint down
+                print(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {str(e)}")
+                continue
+            for name, kind, documentation, samples in families:
+                name = f'{METRICS_NAMESPACE}_{name}'
+                lines.append(f'# HELP {name} {documentation}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in samples:
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+class Metric:
+    """A named metric with a fixed set of label names; values are kept per label combination."""
+
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = f'{METRICS_NAMESPACE}_{name}'
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        Metrics.register(self)
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key):
+        return dict(zip(self.labelnames, key))
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, self._labels(key), value) for key, value in self._values.items()]
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    @contextmanager
+    def track(self, **labels):
+        """Counts the block as in flight while it runs."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(Metric):
+    """Latency histogram; with an `in_flight` gauge (same label names), time() also counts running calls."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS, in_flight=None):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self.in_flight = in_flight
+
+    def observe(self, seconds, **labels):
+        key = self._key(labels)
+        position = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            value = self._values.get(key)
+            if value is None:
+                # Per-bucket counts (the last one is +Inf), sum, count
+                value = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            value[0][position] += 1
+            value[1] += seconds
+            value[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observes how long the block takes, whether or not it raises."""
+        if self.in_flight is not None:
+            self.in_flight.inc(**labels)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+            if self.in_flight is not None:
+                self.in_flight.dec(**labels)
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, (counts, total, count) in self._values.items():
+                labels = self._labels(key)
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                    cumulative += bucket_count
+                    samples.append((f'{self.name}_bucket', {**labels, 'le': _format_value(float(bound))}, cumulative))
+                samples.append((f'{self.name}_sum', labels, total))
+                samples.append((f'{self.name}_count', labels, count))
+        return samples
+
+
+# Metrics shared across modules
+
+RESUME_STAGES_IN_FLIGHT = Gauge('resume_stage_in_flight', 'Resume analysis calls currently in each stage.', ['stage'])
+RESUME_STAGE_SECONDS = Histogram(
+    'resume_stage_seconds',
+    'Time spent in each resume analysis stage (pdf_extract, split_text, embed, index_build, retrieve, llm).',
+    ['stage'], in_flight=RESUME_STAGES_IN_FLIGHT)
+
+SCRAPER_STAGES_IN_FLIGHT = Gauge('scraper_stage_in_flight', 'LinkedIn scraper calls currently in each stage.',
+                                 ['backend', 'stage'])
+SCRAPER_STAGE_SECONDS = Histogram(
+    'scraper_stage_seconds',
+    'Time spent in each LinkedIn scraping stage (driver_start, driver_lease, page_load, scroll, job_cards, '
+    'search, description, total).',
+    ['backend', 'stage'], in_flight=SCRAPER_STAGES_IN_FLIGHT)
+SCRAPER_RETRIES = Counter('scraper_page_load_retries_total', 'Page loads retried after a timeout or error.',
+                          ['backend'])
+SCRAPER_FAILURES = Counter('scraper_page_load_failures_total', 'Page loads that failed after every attempt.',
+                           ['backend'])
+
+CACHE_LOOKUPS = Counter('cache_lookups_total', 'Cache lookups by cache and result (hit or miss).',
+                        ['cache', 'result'])
+
+HTTP_REQUESTS_IN_FLIGHT = Gauge('http_requests_in_flight', 'API requests currently being handled.', ['route'])
+HTTP_REQUEST_SECONDS = Histogram(
+    'http_request_seconds', 'API request latency until the response starts, by route and status code.',
+    ['method', 'route', 'status'])
+
+COALESCED_REQUESTS = Counter('coalesced_requests_total',
+                             'Requests that joined an identical computation already in flight instead of starting one.',
+                             ['name'])
+
+OPENAI_WAIT_SECONDS = Histogram('openai_wait_seconds', 'Time OpenAI calls waited for the rate governor to admit them.',
+                                ['kind', 'priority'])
+OPENAI_RATE_LIMITED = Counter('openai_rate_limited_total', 'OpenAI calls rejected with a rate limit error.', ['kind'])
+
+LLM_TOKENS = Counter('llm_tokens_total', 'LLM tokens sent (input) and generated (output), by model and response cache result.',
+                     ['model', 'direction', 'cache'])
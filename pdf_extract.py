@@ -0,0 +1,127 @@
+import io
+import os
+import time
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+PDF_EXTRACT_WORKERS = int(os.getenv('PDF_EXTRACT_WORKERS', str(min(4, os.cpu_count() or 1))))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv('PDF_PARALLEL_MIN_PAGES', '8'))
+
+
+def extract_page_range(data, start, stop):
+    """Extracts the text of pages [start, stop) of a PDF, returning (text, seconds) per page."""
+    from PyPDF2 import PdfReader
+    reader = PdfReader(io.BytesIO(data))
+    pages = []
+    for number in range(start, stop):
+        began = time.perf_counter()
+        text = reader.pages[number].extract_text()
+        pages.append((text, time.perf_counter() - began))
+    return pages
+
+
+def extract_document(data):
+    """Extracts every page of a PDF, returning (text, seconds) per page."""
+    from PyPDF2 import PdfReader
+    return extract_page_range(data, 0, len(PdfReader(io.BytesIO(data)).pages))
+
+
+class PdfTextExtractor:
+    """Extracts PDF text page by page, fanning long documents out across a process pool.
+
+    PyPDF2 is imported on the first PDF read rather than with this module, both in the API
+    process and in the spawned extraction workers, which start quickly.
+    """
+
+    _executor = None
+    _executor_lock = threading.Lock()
+    _page_timings = deque(maxlen=500)
+
+    @staticmethod
+    def executor():
+        """Returns the process-wide extraction pool, starting it on first use."""
+        with PdfTextExtractor._executor_lock:
+            if PdfTextExtractor._executor is None:
+                PdfTextExtractor._executor = ProcessPoolExecutor(
+                    max_workers=PDF_EXTRACT_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+            return PdfTextExtractor._executor
+
+    @staticmethod
+    def page_ranges(page_count, workers):
+        """Splits page_count pages into at most `workers` contiguous, near-equal ranges."""
+        workers = max(1, min(workers, page_count))
+        size, extra = divmod(page_count, workers)
+        ranges, start = [], 0
+        for worker in range(workers):
+            stop = start + size + (1 if worker < extra else 0)
+            ranges.append((start, stop))
+            start = stop
+        return ranges
+
+    @staticmethod
+    def extract(data):
+        """Returns the text of every page of the PDF bytes `data`, joined once."""
+        from PyPDF2 import PdfReader
+        page_count = len(PdfReader(io.BytesIO(data)).pages)
+        if page_count < PDF_PARALLEL_MIN_PAGES or PDF_EXTRACT_WORKERS <= 1:
+            pages = extract_document(data)
+        else:
+            executor = PdfTextExtractor.executor()
+            futures = [executor.submit(extract_page_range, data, start, stop)
+                       for start, stop in PdfTextExtractor.page_ranges(page_count, PDF_EXTRACT_WORKERS)]
+            pages = [page for future in futures for page in future.result()]
+        PdfTextExtractor._record(pages)
+        return ''.join(text for text, _ in pages)
+
+    @staticmethod
+    def extract_many(documents):
+        """Extracts several PDFs at once, one worker process per document.
+
+        Returns one entry per document, in order: its text, or the exception it raised.
+        """
+        if not documents:
+            return []
+        if len(documents) == 1 or PDF_EXTRACT_WORKERS <= 1:
+            pages_per_document = []
+            for data in documents:
+                try:
+                    pages_per_document.append(extract_document(data))
+                except Exception as e:
+                    pages_per_document.append(e)
+        else:
+            executor = PdfTextExtractor.executor()
+            futures = [executor.submit(extract_document, data) for data in documents]
+            pages_per_document = []
+            for future in futures:
+                try:
+                    pages_per_document.append(future.result())
+                except Exception as e:
+                    pages_per_document.append(e)
+        texts = []
+        for pages in pages_per_document:
+            if isinstance(pages, Exception):
+                texts.append(pages)
+                continue
+            PdfTextExtractor._record(pages)
+            texts.append(''.join(text for text, _ in pages))
+        return texts
+
+    @staticmethod
+    def _record(pages):
+        for number, (_, seconds) in enumerate(pages):
+            PdfTextExtractor._page_timings.append({'page': number, 'pages': len(pages), 'seconds': seconds})
+
+    @staticmethod
+    def page_timings():
+        """Returns the most recent per-page extraction times."""
+        return list(PdfTextExtractor._page_timings)
+
+    @staticmethod
+    def shutdown():
+        with PdfTextExtractor._executor_lock:
+            executor, PdfTextExtractor._executor = PdfTextExtractor._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
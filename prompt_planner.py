@@ -0,0 +1,149 @@
+import os
+import re
+import threading
+from collections import deque
+import tiktoken
+from metrics import LLM_TOKENS
+
+
+# Most tokens a prompt may send: the question plus the retrieved resume chunks stuffed next to it
+PROMPT_TOKEN_BUDGET = int(os.getenv('PROMPT_TOKEN_BUDGET', '3000'))
+# Tokens set aside for the QA chain's own instructions around the question and context
+PROMPT_TEMPLATE_TOKENS = 60
+# Characters per token assumed when the tiktoken encoding cannot be loaded (it is downloaded on first use)
+APPROX_CHARS_PER_TOKEN = 4
+# Longest overlap looked for between consecutive chunks (the splitter uses 200 characters)
+MAX_CHUNK_OVERLAP = 400
+# Shortest suffix/prefix match taken for a real overlap; shorter ones are usually coincidence
+# (the splitter often breaks at paragraphs with no overlap at all)
+MIN_CHUNK_OVERLAP = 20
+
+
+class PromptPlanner:
+    """Builds LLM prompts within a token budget, without sending the same resume text twice."""
+
+    _encodings = {}
+    _encodings_lock = threading.Lock()
+    _usage = deque(maxlen=500)
+
+    @staticmethod
+    def encoding(model):
+        """Returns the tiktoken encoding for model, or None if it cannot be loaded (e.g. offline)."""
+        with PromptPlanner._encodings_lock:
+            if model not in PromptPlanner._encodings:
+                try:
+                    try:
+                        PromptPlanner._encodings[model] = tiktoken.encoding_for_model(model)
+                    except KeyError:
+                        PromptPlanner._encodings[model] = tiktoken.get_encoding('cl100k_base')
+                except Exception as e:
+                    print(f"Could not load the tiktoken encoding, estimating token counts: {str(e)}")
+                    PromptPlanner._encodings[model] = None
+            return PromptPlanner._encodings[model]
+
+    @staticmethod
+    def count(text, model):
+        encoding = PromptPlanner.encoding(model)
+        if encoding is None:
+            return -(-len(text) // APPROX_CHARS_PER_TOKEN)
+        return len(encoding.encode(text, disallowed_special=()))
+
+    @staticmethod
+    def truncate(text, max_tokens, model):
+        """Cuts text down to at most max_tokens tokens."""
+        max_tokens = max(0, max_tokens)
+        encoding = PromptPlanner.encoding(model)
+        if encoding is None:
+            return text[:max_tokens * APPROX_CHARS_PER_TOKEN]
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return encoding.decode(tokens[:max_tokens])
+
+    @staticmethod
+    def overlap(previous, chunk):
+        """Length of the longest suffix of previous that chunk starts with, or 0 if there is none that is
+        at least MIN_CHUNK_OVERLAP characters long and covers whole words."""
+        for size in range(min(len(previous), len(chunk), MAX_CHUNK_OVERLAP), MIN_CHUNK_OVERLAP - 1, -1):
+            if not previous.endswith(chunk[:size]):
+                continue
+            # The splitter overlaps whole words: the match starts a word in previous and ends one in chunk
+            starts_word = size == len(previous) or previous[-size - 1].isspace()
+            ends_word = size == len(chunk) or chunk[size].isspace() or chunk[size - 1].isspace()
+            if starts_word and ends_word:
+                return size
+        return 0
+
+    @staticmethod
+    def merge_chunks(chunks):
+        """Rebuilds the document text from overlapping splitter chunks, keeping each overlap once."""
+        if isinstance(chunks, str):
+            return chunks
+        text = ''
+        previous = ''
+        for chunk in chunks:
+            size = PromptPlanner.overlap(previous, chunk)
+            if text and not size:
+                text += '\n'
+            text += chunk[size:]
+            previous = chunk
+        return text
+
+    @staticmethod
+    def build(template, context, model, budget=None):
+        """Fills the {context} placeholder of template so the whole prompt fits in the token budget.
+
+        context may be a resume's chunk list, which is merged back into plain text first.
+        """
+        budget = PROMPT_TOKEN_BUDGET if budget is None else budget
+        context = PromptPlanner.merge_chunks(context)
+        available = budget - PROMPT_TEMPLATE_TOKENS - PromptPlanner.count(template.replace('{context}', ''), model)
+        return template.replace('{context}', PromptPlanner.truncate(context, available, model))
+
+    @staticmethod
+    def normalize(text):
+        return re.sub(r'\s+', ' ', text).strip()
+
+    @staticmethod
+    def select_docs(docs, question, model, budget=None):
+        """Drops retrieved documents whose text the question already contains, then keeps as many of the
+        rest (in retrieval order) as fit in the budget left after the question."""
+        budget = PROMPT_TOKEN_BUDGET if budget is None else budget
+        question_text = PromptPlanner.normalize(question)
+        remaining = budget - PROMPT_TEMPLATE_TOKENS - PromptPlanner.count(question, model)
+        selected = []
+        for doc in docs:
+            if PromptPlanner.normalize(doc.page_content) in question_text:
+                continue
+            tokens = PromptPlanner.count(doc.page_content, model)
+            if tokens > remaining:
+                break
+            selected.append(doc)
+            remaining -= tokens
+        return selected
+
+    @staticmethod
+    def input_tokens(model, question, docs):
+        """Tokens an LLM call sends: the chain's instructions, the question and the retrieved documents."""
+        return (PROMPT_TEMPLATE_TOKENS + PromptPlanner.count(question, model)
+                + sum(PromptPlanner.count(doc.page_content, model) for doc in docs))
+
+    @staticmethod
+    def record(model, question, docs, response, seconds, cached=False):
+        """Logs and keeps the input/output token counts of one LLM call."""
+        input_tokens = PromptPlanner.input_tokens(model, question, docs)
+        output_tokens = PromptPlanner.count(response, model)
+        usage = {'model': model, 'input_tokens': input_tokens, 'output_tokens': output_tokens,
+                 'seconds': seconds, 'cached': cached}
+        PromptPlanner._usage.append(usage)
+        cache_label = 'hit' if cached else 'miss'
+        LLM_TOKENS.inc(input_tokens, model=model, direction='input', cache=cache_label)
+        LLM_TOKENS.inc(output_tokens, model=model, direction='output', cache=cache_label)
+        print(f"LLM call: {input_tokens} input tokens, {output_tokens} output tokens, {seconds:.2f}s"
+              + (" (cached)" if cached else ""))
+        return usage
+
+    @staticmethod
+    def token_usage():
+        """Returns the most recent LLM calls with their input/output token counts and latency."""
+        return list(PromptPlanner._usage)
@@ -0,0 +1,290 @@
+import os
+import re
+import time
+import heapq
+import hashlib
+import random
+import itertools
+import threading
+import contextvars
+from collections import OrderedDict
+from metrics import OPENAI_WAIT_SECONDS, OPENAI_RATE_LIMITED
+
+
+# Account limits per minute for each kind of OpenAI call (0 disables that bucket)
+OPENAI_CHAT_RPM = int(os.getenv('OPENAI_CHAT_RPM', '3500'))
+OPENAI_CHAT_TPM = int(os.getenv('OPENAI_CHAT_TPM', '90000'))
+OPENAI_EMBEDDING_RPM = int(os.getenv('OPENAI_EMBEDDING_RPM', '3000'))
+OPENAI_EMBEDDING_TPM = int(os.getenv('OPENAI_EMBEDDING_TPM', '1000000'))
+# Most calls of one kind in flight at once; halved on every rate limit error and regrown on successes
+OPENAI_MAX_CONCURRENCY = int(os.getenv('OPENAI_MAX_CONCURRENCY', '16'))
+# Rate-limited calls, timeouts, connection errors and server errors are retried up to OPENAI_MAX_RETRIES
+# times, backing off exponentially from OPENAI_BACKOFF seconds up to OPENAI_BACKOFF_MAX (or for as long
+# as the Retry-After header asks)
+OPENAI_MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', '6'))
+OPENAI_BACKOFF = float(os.getenv('OPENAI_BACKOFF', '1'))
+OPENAI_BACKOFF_MAX = float(os.getenv('OPENAI_BACKOFF_MAX', '60'))
+# Random extra delay, as a fraction of the backoff, so paused callers do not all resume at once
+OPENAI_BACKOFF_JITTER = 0.25
+# Errors (from the 0.x or 1.x OpenAI client) worth retrying that do not mean the account is over its limits
+TRANSIENT_ERRORS = {'Timeout', 'APITimeoutError', 'APIConnectionError', 'ServiceUnavailableError',
+                    'InternalServerError'}
+# Set when every caller's key belongs to one OpenAI account, so all calls share one set of buckets and
+# backoff; by default each API key gets its own, and one key's rate limits never slow down another's
+OPENAI_SINGLE_ACCOUNT = os.getenv('OPENAI_SINGLE_ACCOUNT', '').lower() in ('1', 'true', 'yes')
+# Most per-key governors kept per kind of call; idle ones are forgotten, least recently used first
+OPENAI_MAX_ACCOUNTS = int(os.getenv('OPENAI_MAX_ACCOUNTS', '1024'))
+# Output tokens reserved for a chat call before its response length is known
+OPENAI_CHAT_OUTPUT_TOKENS = int(os.getenv('OPENAI_CHAT_OUTPUT_TOKENS', '400'))
+
+# Waiting calls are admitted lowest priority value first, so interactive requests go ahead of batch work
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: 'interactive', PRIORITY_BATCH: 'batch'}
+openai_priority = contextvars.ContextVar('openai_priority', default=PRIORITY_INTERACTIVE)
+
+
+class TokenBucket:
+    """Refills continuously at `per_minute` per minute and holds at most one minute's worth.
+
+    A rate of 0 never limits.
+    """
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until `amount` can be taken (requests larger than the bucket wait for a full bucket)."""
+        if not self.rate:
+            return 0.0
+        self._refill(now)
+        return max(0.0, (min(amount, self.capacity) - self.level) / self.rate)
+
+    def take(self, amount, now):
+        if self.rate:
+            self._refill(now)
+            self.level -= min(amount, self.capacity)
+
+    def adjust(self, amount):
+        """Takes (or, if negative, returns) tokens once a call's actual usage is known; may go into debt."""
+        if self.rate:
+            self.level = min(self.capacity, self.level - amount)
+
+
+class RateGovernor:
+    """Admission control for one kind of OpenAI call ('chat' or 'embeddings') made with one API key
+    (or with any key, under OPENAI_SINGLE_ACCOUNT).
+
+    A call waits until the requests-per-minute and tokens-per-minute buckets both have room, fewer
+    than the adaptive concurrency limit are in flight, and no rate-limit backoff is in progress.
+    Waiting calls are admitted in priority order (interactive before batch), then first come first
+    served. A rate limit error pauses every caller of that kind, honouring Retry-After, and halves
+    the concurrency limit, which then grows back by about one per limit's worth of successful calls.
+    """
+
+    _instances = OrderedDict()  # (kind, account) -> governor, least recently used first
+    _instances_lock = threading.Lock()
+
+    def __init__(self, name, rpm, tpm, max_concurrency=OPENAI_MAX_CONCURRENCY, account='shared'):
+        self.name = name
+        self.account = account
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency_limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.rate_limited = 0
+        self._cond = threading.Condition()
+        self._waiting = []  # heap of (priority, arrival)
+        self._arrivals = itertools.count()
+
+    @staticmethod
+    def account(api_key):
+        """Identifies the account an API key's calls are governed under, without keeping the key itself."""
+        if OPENAI_SINGLE_ACCOUNT or not api_key:
+            return 'shared'
+        return hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+
+    @classmethod
+    def shared(cls, kind, api_key=None):
+        """Returns this process's governor for 'chat' or 'embeddings' calls made with api_key."""
+        if kind == 'chat':
+            rpm, tpm = OPENAI_CHAT_RPM, OPENAI_CHAT_TPM
+        elif kind == 'embeddings':
+            rpm, tpm = OPENAI_EMBEDDING_RPM, OPENAI_EMBEDDING_TPM
+        else:
+            raise ValueError(f"Unknown OpenAI call kind: {kind}")
+        key = (kind, cls.account(api_key))
+        with cls._instances_lock:
+            governor = cls._instances.get(key)
+            if governor is None:
+                cls._forget_idle(kind)
+                governor = cls._instances[key] = cls(kind, rpm, tpm, account=key[1])
+            cls._instances.move_to_end(key)
+            return governor
+
+    @classmethod
+    def _forget_idle(cls, kind):
+        """Drops least recently used idle governors of a kind once there are OPENAI_MAX_ACCOUNTS. Caller holds
+        _instances_lock."""
+        keys = [key for key in cls._instances if key[0] == kind]
+        for key in keys[:max(0, len(keys) - OPENAI_MAX_ACCOUNTS + 1)]:
+            if cls._instances[key].idle():
+                del cls._instances[key]
+
+    @classmethod
+    def governors(cls):
+        """Returns every governor in this process."""
+        with cls._instances_lock:
+            return list(cls._instances.values())
+
+    def idle(self):
+        """True when no call is in flight or waiting and no backoff is in progress."""
+        with self._cond:
+            return not self.in_flight and not self._waiting and self.paused_until <= time.monotonic()
+
+    @staticmethod
+    def set_priority(priority):
+        """Sets the priority of OpenAI calls made from the current context (and tasks or threads started
+        from it with a copy of the context)."""
+        return openai_priority.set(priority)
+
+    def acquire(self, tokens, requests=1, priority=None):
+        """Blocks until one call that uses `tokens` tokens and `requests` API requests may start."""
+        priority = openai_priority.get() if priority is None else priority
+        entry = (priority, next(self._arrivals))
+        start = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    timeout = None  # not first in line or no free slot: wait to be notified
+                    if self._waiting[0] == entry and self.in_flight < int(self.concurrency_limit):
+                        now = time.monotonic()
+                        timeout = max(self.paused_until - now, self.requests.wait_time(requests, now),
+                                      self.tokens.wait_time(tokens, now))
+                        if timeout <= 0:
+                            self.requests.take(requests, now)
+                            self.tokens.take(tokens, now)
+                            self.in_flight += 1
+                            break
+                    self._cond.wait(timeout)
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+        OPENAI_WAIT_SECONDS.observe(time.monotonic() - start, kind=self.name,
+                                    priority=PRIORITY_NAMES.get(priority, priority))
+
+    def release(self, rate_limited=False, retry_after=None, attempt=0, failed=False):
+        """Ends a call started with acquire; after a rate limit error, pauses every caller and backs off.
+
+        A call that failed for another reason (failed=True) leaves the concurrency limit as it is.
+        """
+        with self._cond:
+            self.in_flight -= 1
+            if rate_limited:
+                self.rate_limited += 1
+                self.concurrency_limit = max(1.0, self.concurrency_limit / 2)
+                self.paused_until = max(self.paused_until, time.monotonic() + self.backoff(retry_after, attempt))
+            elif not failed:
+                self.concurrency_limit = min(float(self.max_concurrency),
+                                             self.concurrency_limit + 1 / self.concurrency_limit)
+            self._cond.notify_all()
+        if rate_limited:
+            OPENAI_RATE_LIMITED.inc(kind=self.name)
+
+    def adjust_tokens(self, amount):
+        """Corrects the token bucket by the difference between a call's actual and reserved tokens."""
+        with self._cond:
+            self.tokens.adjust(amount)
+
+    @staticmethod
+    def backoff(retry_after, attempt):
+        """Seconds to pause after a rate limit error: Retry-After when the API sent one, else exponential, plus jitter."""
+        delay = retry_after if retry_after is not None else min(OPENAI_BACKOFF_MAX, OPENAI_BACKOFF * 2 ** attempt)
+        return delay + random.uniform(0, delay * OPENAI_BACKOFF_JITTER)
+
+    def call(self, func, tokens, requests=1, priority=None, retry_if=None):
+        """Runs func() once admitted, retrying it after rate limit and transient errors (while retry_if(error),
+        if given, agrees).
+
+        A rate limit error pauses every caller; a transient error (timeout, connection or server error)
+        only backs off this call. Other errors, and the last retryable one, are raised to the caller.
+        """
+        for attempt in range(OPENAI_MAX_RETRIES + 1):
+            self.acquire(tokens, requests, priority)
+            try:
+                result = func()
+            except Exception as e:
+                limited = is_rate_limit_error(e)
+                transient = not limited and is_transient_error(e)
+                self.release(rate_limited=limited, retry_after=retry_after_seconds(e) if limited else None,
+                             attempt=attempt, failed=not limited)
+                if (not (limited or transient) or attempt == OPENAI_MAX_RETRIES
+                        or (retry_if is not None and not retry_if(e))):
+                    raise
+                if transient:
+                    time.sleep(self.backoff(None, attempt))
+                continue
+            self.release()
+            return result
+
+    def stats(self):
+        """Current concurrency limit, calls in flight and waiting (by priority), and rate limit errors seen."""
+        with self._cond:
+            waiting = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _ in self._waiting:
+                name = PRIORITY_NAMES.get(priority, str(priority))
+                waiting[name] = waiting.get(name, 0) + 1
+            return {
+                'kind': self.name,
+                'account': self.account,
+                'concurrency_limit': int(self.concurrency_limit),
+                'in_flight': self.in_flight,
+                'waiting': waiting,
+                'paused_seconds': max(0.0, self.paused_until - time.monotonic()),
+                'rate_limited': self.rate_limited,
+            }
+
+
+def is_rate_limit_error(e):
+    """True for OpenAI rate limit errors from either the 0.x or the 1.x client."""
+    return (type(e).__name__ == 'RateLimitError' or getattr(e, 'status_code', None) == 429
+            or getattr(e, 'http_status', None) == 429)
+
+
+def is_transient_error(e):
+    """True for OpenAI timeouts, connection errors and server (5xx) errors, which are worth retrying."""
+    if type(e).__name__ in TRANSIENT_ERRORS:
+        return True
+    # The 0.x client raises a bare APIError for most server-side failures
+    if type(e).__name__ == 'APIError' and getattr(e, 'http_status', None) in (None, 500, 502, 503, 504):
+        return True
+    status = getattr(e, 'status_code', None) or getattr(e, 'http_status', None)
+    return isinstance(status, int) and status >= 500
+
+
+def retry_after_seconds(e):
+    """How long a rate limit error asks callers to wait, from its Retry-After headers or message, if it says."""
+    response = getattr(e, 'response', None)
+    headers = getattr(response, 'headers', None) or getattr(e, 'headers', None) or {}
+    try:
+        if headers.get('retry-after-ms') is not None:
+            return float(headers['retry-after-ms']) / 1000
+        if headers.get('retry-after') is not None:
+            return float(headers['retry-after'])
+    except (TypeError, ValueError):
+        pass  # e.g. an HTTP date; fall back to the message or exponential backoff
+    match = re.search(r'try again in (\d+(?:\.\d+)?)\s*(ms|s)\b', str(e))
+    if match:
+        return float(match.group(1)) / (1000 if match.group(2) == 'ms' else 1)
+    return None
@@ -0,0 +1,153 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from metrics import CACHE_LOOKUPS
+
+
+LLM_CACHE_BACKEND = os.getenv('LLM_CACHE_BACKEND', 'memory')  # 'memory', 'sqlite' or 'none'
+LLM_CACHE_TTL = float(os.getenv('LLM_CACHE_TTL', '86400'))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '1000'))
+LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH', '.llm_cache.sqlite3')
+
+
+class MemoryCacheBackend:
+    """In-process LRU store of (expires_at, response) pairs."""
+
+    def __init__(self, max_entries=LLM_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, now):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCacheBackend:
+    """SQLite store shared by every worker process on the host, evicting least recently used rows."""
+
+    def __init__(self, path=LLM_CACHE_PATH, max_entries=LLM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('''CREATE TABLE IF NOT EXISTS responses (
+                                      key TEXT PRIMARY KEY,
+                                      value TEXT NOT NULL,
+                                      expires_at REAL NOT NULL,
+                                      last_used REAL NOT NULL)''')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)')
+
+    def get(self, key, now):
+        with self._lock, self._conn:
+            row = self._conn.execute('SELECT value FROM responses WHERE key = ? AND expires_at > ?',
+                                     (key, now)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE responses SET last_used = ? WHERE key = ?', (now, key))
+            return json.loads(row[0])
+
+    def set(self, key, value, expires_at):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute('INSERT OR REPLACE INTO responses (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)',
+                               (key, json.dumps(value), expires_at, now))
+            self._conn.execute('DELETE FROM responses WHERE expires_at <= ?', (now,))
+            self._conn.execute('''DELETE FROM responses WHERE key IN (
+                                      SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)''',
+                               (self.max_entries,))
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM responses')
+
+
+class ResponseCache:
+    """TTL cache of LLM responses keyed on model, temperature, normalized question and retrieved documents."""
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, backend, ttl=LLM_CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def shared(cls):
+        """Returns the process-wide cache configured by LLM_CACHE_BACKEND, or None when caching is disabled."""
+        with cls._shared_lock:
+            if cls._shared is None and LLM_CACHE_BACKEND != 'none':
+                if LLM_CACHE_BACKEND == 'sqlite':
+                    backend = SQLiteCacheBackend()
+                elif LLM_CACHE_BACKEND == 'memory':
+                    backend = MemoryCacheBackend()
+                else:
+                    raise ValueError(f"Unknown LLM_CACHE_BACKEND '{LLM_CACHE_BACKEND}'")
+                cls._shared = cls(backend)
+            return cls._shared
+
+    @staticmethod
+    def key(model, temperature, question, docs):
+        """Builds the cache key; whitespace differences in the question do not change it."""
+        normalized_question = ' '.join(question.split())
+        doc_hashes = [hashlib.sha256(doc.page_content.encode('utf-8')).hexdigest() for doc in docs]
+        payload = json.dumps([model, temperature, normalized_question, doc_hashes])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        value = self.backend.get(key, time.time())
+        if value is None:
+            self.misses += 1
+            CACHE_LOOKUPS.inc(cache='llm_responses', result='miss')
+        else:
+            self.hits += 1
+            CACHE_LOOKUPS.inc(cache='llm_responses', result='hit')
+        return value
+
+    def set(self, key, value):
+        self.backend.set(key, value, time.time() + self.ttl)
+
+    def stats(self):
+        """Hit/miss counters for this process and the current number of cached responses."""
+        lookups = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__,
+            'entries': len(self.backend),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
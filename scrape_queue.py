@@ -0,0 +1,225 @@
+import os
+import time
+import uuid
+import threading
+import multiprocessing
+from multiprocessing import util
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from job_store import JobStore
+
+
+SCRAPE_QUEUE_WORKERS = int(os.getenv('SCRAPE_QUEUE_WORKERS', '2'))
+SCRAPE_JOB_TTL = float(os.getenv('SCRAPE_JOB_TTL', '3600'))
+
+
+def _init_worker():
+    """Quits the worker process's pooled Chrome drivers when the process exits."""
+    from core_functions import LinkedinScraper
+    util.Finalize(None, lambda: LinkedinScraper.driver_pool().close(), exitpriority=10)
+
+
+def run_scrape(backend, job_titles_list, job_location, job_count):
+    """Runs one scrape in a worker process and returns the postings as JSON-ready records."""
+    if backend == 'http':
+        from http_scraper import LinkedinHttpScraper
+        df = LinkedinHttpScraper().get_linkedin_jobs(job_titles_list, job_location, job_count)
+    else:
+        from core_functions import LinkedinScraper
+        df = LinkedinScraper.get_linkedin_jobs(job_titles_list, job_location, job_count)
+    return df.to_dict(orient='records')
+
+
+class ScrapeJob:
+    def __init__(self, key, backend, job_titles_list, job_location, job_count):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.backend = backend
+        self.args = (job_titles_list, job_location, job_count)
+        self.status = 'queued'
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+
+    def to_dict(self):
+        job_titles_list, job_location, job_count = self.args
+        data = {'job_id': self.id, 'status': self.status, 'backend': self.backend,
+                'job_titles': job_titles_list, 'job_location': job_location, 'job_count': job_count,
+                'submitted_at': self.submitted_at, 'started_at': self.started_at,
+                'finished_at': self.finished_at}
+        if self.status == 'done':
+            data['linkedin_jobs'] = self.result
+        elif self.status == 'failed':
+            data['error'] = self.error
+        return data
+
+
+class ScrapeQueue:
+    """FIFO queue of LinkedIn scrapes executed by a bounded pool of worker processes.
+
+    submit() returns immediately with a job that can be polled with status(). Submitting a
+    query identical to one that is still queued or running returns that job instead of
+    scraping twice. Every status change is also written to the job store, so an API process
+    can answer polls for jobs another process queued. Finished jobs are kept for
+    SCRAPE_JOB_TTL seconds. If a worker process dies, its scrape fails and the pool is
+    replaced for the jobs after it.
+    """
+
+    def __init__(self, max_workers=SCRAPE_QUEUE_WORKERS, job_ttl=SCRAPE_JOB_TTL, store=None):
+        self.max_workers = max_workers
+        self.job_ttl = job_ttl
+        self._store = store
+        # Re-entrant: a future that is already done runs its callback inside _dispatch
+        self._lock = threading.RLock()
+        self._jobs = {}
+        self._pending = {}  # query key -> queued or running job
+        self._queued = deque()
+        self._running = 0
+        self._finished = {'done': 0, 'failed': 0}
+        self._executor = None
+        self._closed = False
+
+    @staticmethod
+    def query_key(backend, job_titles_list, job_location, job_count):
+        titles = tuple(sorted(title.strip().lower() for title in job_titles_list))
+        return backend, titles, job_location.strip().lower(), job_count
+
+    def submit(self, backend, job_titles_list, job_location, job_count):
+        """Queues a scrape, or returns the identical one already pending."""
+        key = self.query_key(backend, job_titles_list, job_location, job_count)
+        with self._lock:
+            self._prune()
+            if key in self._pending:
+                return self._pending[key]
+            job = ScrapeJob(key, backend, job_titles_list, job_location, job_count)
+            self._jobs[job.id] = job
+            self._pending[key] = job
+            self._queued.append(job)
+            self._save(job)
+            self._dispatch()
+            return job
+
+    def get(self, job_id):
+        """Returns a job queued by this process, or None."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def status(self, job_id):
+        """Returns the job's to_dict(), from this process or from the job store; None if unknown or expired."""
+        job = self.get(job_id)
+        if job is not None:
+            with self._lock:
+                return job.to_dict()
+        try:
+            data = self.store().scrape_job(job_id)
+        except Exception as e:
+            print(f"Could not read scrape job {job_id}: {str(e)}")
+            return None
+        if data is not None and data.get('finished_at') is not None and data['finished_at'] < time.time() - self.job_ttl:
+            return None
+        return data
+
+    def store(self):
+        return self._store if self._store is not None else JobStore.shared()
+
+    def _save(self, job):
+        """Writes the job's status to the job store. Caller holds the lock."""
+        try:
+            self.store().save_scrape_job(job.id, job.to_dict(), job.finished_at)
+        except Exception as e:
+            print(f"Could not save scrape job {job.id}: {str(e)}")
+
+    def _dispatch(self):
+        """Hands queued jobs to the process pool while it has idle workers. Caller holds the lock."""
+        # Jobs only reach the pool when a worker is free, so 'running' is accurate
+        # and queued jobs stay visible (and deduplicable) here
+        while self._queued and self._running < self.max_workers:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                     mp_context=multiprocessing.get_context('spawn'),
+                                                     initializer=_init_worker)
+            job = self._queued.popleft()
+            job.status = 'running'
+            job.started_at = time.time()
+            self._running += 1
+            executor = self._executor
+            try:
+                future = executor.submit(run_scrape, job.backend, *job.args)
+            except Exception as e:
+                # e.g. BrokenProcessPool: fail this job and start a new pool for the next one
+                self._drop_executor(executor)
+                self._finish(job, error=e)
+                continue
+            self._save(job)
+            future.add_done_callback(lambda future, job=job, executor=executor: self._complete(job, future, executor))
+
+    def _complete(self, job, future, executor):
+        with self._lock:
+            try:
+                result = future.result()
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    self._drop_executor(executor)
+                self._finish(job, error=e)
+            else:
+                self._finish(job, result=result)
+            if not self._closed:
+                self._dispatch()
+
+    def _finish(self, job, result=None, error=None):
+        """Marks a running job done (or failed, if error is given). Caller holds the lock."""
+        if error is None:
+            job.result = result
+            job.status = 'done'
+        else:
+            job.error = str(error) or type(error).__name__
+            job.status = 'failed'
+        job.finished_at = time.time()
+        self._finished[job.status] += 1
+        self._running -= 1
+        if self._pending.get(job.key) is job:
+            del self._pending[job.key]
+        self._save(job)
+
+    def _drop_executor(self, executor):
+        """Forgets a broken process pool so the next dispatch starts a new one. Caller holds the lock."""
+        if self._executor is executor:
+            self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _prune(self):
+        """Forgets finished jobs older than job_ttl. Caller holds the lock."""
+        cutoff = time.time() - self.job_ttl
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished_at is not None and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+        try:
+            self.store().forget_scrape_jobs(cutoff)
+        except Exception as e:
+            print(f"Could not forget expired scrape jobs: {str(e)}")
+
+    def stats(self):
+        """Queue depth and job counts by status."""
+        with self._lock:
+            return {'queued': len(self._queued), 'running': self._running,
+                    'done': self._finished['done'], 'failed': self._finished['failed'],
+                    'workers': self.max_workers}
+
+    def shutdown(self):
+        """Drops queued jobs and stops the worker processes once running scrapes finish."""
+        with self._lock:
+            for job in self._queued:
+                job.status = 'failed'
+                job.error = 'Scrape queue shut down'
+                job.finished_at = time.time()
+                self._finished['failed'] += 1
+                del self._pending[job.key]
+                self._save(job)
+            self._queued.clear()
+            self._closed = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,87 @@
+"""Reports how long importing a module takes, broken down by the packages it pulls in.
+
+Runs `python -X importtime -c "import <module>"` in fresh interpreters (so nothing is
+already imported) and reports the median over several runs. Examples:
+
+    python scripts/import_time_report.py                      # import main
+    python scripts/import_time_report.py core_functions --top 15
+    python scripts/import_time_report.py --json > import_times.json
+    python scripts/import_time_report.py --max-seconds 1.5    # exit 1 if startup regressed
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(module):
+    """Imports module once in a fresh interpreter and returns [(depth, name, self_us, cumulative_us)]."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=REPO_ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise SystemExit(f'Importing {module} failed:\n{result.stderr}')
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def summarize(runs, module):
+    """Median total import time, and median cumulative time of each top-level package imported directly
+    or indirectly by the module (the first time it was imported)."""
+    totals, packages = [], {}
+    for rows in runs:
+        totals.append(next(cumulative for _, name, _, cumulative in rows if name == module))
+        per_run = {}
+        for _, name, self_us, _ in rows:
+            package = name.split('.')[0]
+            per_run[package] = per_run.get(package, 0) + self_us
+        for package, self_us in per_run.items():
+            packages.setdefault(package, []).append(self_us)
+    return {
+        'module': module,
+        'python': sys.version.split()[0],
+        'runs': len(runs),
+        'total_seconds': statistics.median(totals) / 1e6,
+        # Self time summed over every submodule of the package, i.e. what importing it costs
+        'packages': sorted(({'package': package, 'seconds': statistics.median(times) / 1e6}
+                            for package, times in packages.items()),
+                           key=lambda entry: entry['seconds'], reverse=True),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('module', nargs='?', default='main', help='module to import (default: main)')
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters to measure (default: 5)')
+    parser.add_argument('--top', type=int, default=20, help='packages to list (default: 20)')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    parser.add_argument('--max-seconds', type=float, help='exit with status 1 if the import takes longer')
+    args = parser.parse_args()
+
+    report = summarize([measure(args.module) for _ in range(args.runs)], args.module)
+    report['packages'] = report['packages'][:args.top]
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"import {args.module}: {report['total_seconds']:.3f}s "
+              f"(median of {report['runs']} runs, Python {report['python']})")
+        for entry in report['packages']:
+            print(f"  {entry['seconds']:8.3f}s  {entry['package']}")
+    if args.max_seconds is not None and report['total_seconds'] > args.max_seconds:
+        print(f"import {args.module} took {report['total_seconds']:.3f}s, over the {args.max_seconds:g}s limit",
+              file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
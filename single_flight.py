@@ -0,0 +1,36 @@
+import asyncio
+from metrics import COALESCED_REQUESTS
+
+
+class SingleFlight:
+    """Runs at most one computation per key at a time; concurrent callers with the same key await it too.
+
+    Every caller gets the same result, or the same exception if it fails. The key is forgotten as
+    soon as the computation finishes, so later calls start a fresh one (results are not cached here).
+    A caller that is cancelled (e.g. its client disconnected) stops waiting without cancelling the
+    computation the other callers share.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+
+    async def run(self, key, func, *args, **kwargs):
+        """Awaits func(*args, **kwargs), or the call already in flight for key."""
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func(*args, **kwargs))
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            COALESCED_REQUESTS.inc(name=self.name)
+        return await asyncio.shield(future)
+
+    def _forget(self, key, future):
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        if not future.cancelled():
+            future.exception()  # retrieved, so it is not logged as unhandled if every caller went away
+
+    def __len__(self):
+        return len(self._calls)